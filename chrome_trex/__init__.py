@@ -8,18 +8,40 @@ from chrome_trex.constants import (  # noqa: F401
     WHITE,
     WIDTH,
 )
+from chrome_trex.core.course import ObstacleCourse, generate_course  # noqa: F401
 from chrome_trex.core.dino_game import DinoGame  # noqa: F401
+from chrome_trex.core.evaluation import (  # noqa: F401
+    PopulationFitness,
+    StackedPolicy,
+    evaluate_population,
+)
+from chrome_trex.core.game_pool import DinoGamePool  # noqa: F401
 from chrome_trex.core.multi_dino_game import (  # noqa: F401
     Cactus,
     Cloud,
-    Dino,
     Ground,
     MultiDinoGame,
     Ptera,
-    Scoreboard,
 )
+from chrome_trex.core.objects.dino import Dino  # noqa: F401
+from chrome_trex.core.objects.scoreboard import Scoreboard  # noqa: F401
+from chrome_trex.core.observation import PixelObserver  # noqa: F401
+from chrome_trex.core.population import DinoPopulation  # noqa: F401
+from chrome_trex.core.profiler import StepProfiler  # noqa: F401
+from chrome_trex.core.recorder import (  # noqa: F401
+    EpisodeRecorder,
+    EpisodeReplayer,
+    RecordedEpisode,
+)
+from chrome_trex.core.vector_dino_game import VectorDinoGame  # noqa: F401
 from chrome_trex.helpers import (  # noqa: F401
+    ImageAsset,
+    SpriteSheet,
+    clear_asset_cache,
     extract_digits,
+    get_asset_cache_stats,
+    get_image,
+    get_sprite_sheet,
     load_image,
     load_sprite_sheet,
 )
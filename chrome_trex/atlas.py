@@ -0,0 +1,199 @@
+"""
+Prebaked sprite atlas, shared between processes through a memory map.
+
+Every frame of the sprite sheets used by the game is baked, already sliced,
+scaled and colorkeyed, into `sprites/atlas.bin`, along with its collision mask
+packed as one uint64 per row. The atlas is memory-mapped, so no image is decoded
+or scaled at runtime and every process reading it shares the same pages. Run
+`python -m chrome_trex.bake` to bake it again after changing a sprite.
+
+The file starts with an 8 bytes magic and the length of a JSON index as a
+little-endian uint32, followed by the index and by the pixel and mask blocks,
+each aligned on 64 bytes. The index maps each sheet to its frame count, frame
+size, colorkey and the offsets of its blocks. Pixels are stored in RGBX order
+and masks as little-endian uint64.
+"""
+
+import json
+import os
+import pkgutil
+import struct
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from chrome_trex.constants import SPRITE_SCALE_Y
+
+ATLAS_FILE = os.path.join("sprites", "atlas.bin")
+MAGIC = b"TREXATL1"
+ALIGNMENT = 64
+
+# Every sprite sheet used by the game, as (sheetname, nx, ny, scalex, scaley),
+# all of them with a colorkey of -1
+BAKED_SHEETS = [
+    ("dino.png", 5, 1, 44, 47),
+    ("dino_ducking.png", 2, 1, 59, 47),
+    ("cacti-small.png", 3, 1, 40, 40),
+    ("ptera.png", 2, 1, 46, 40),
+    ("numbers.png", 12, 1, 11, SPRITE_SCALE_Y),
+    ("cloud.png", 1, 1, int(90 * 30 / 42), 30),
+    ("ground.png", 1, 1, -1, -1),
+]
+
+
+class AtlasEntry(NamedTuple):
+    """
+    The frames of a baked sprite sheet, as read-only views of the atlas.
+    """
+
+    size: Tuple[int, int]
+    colorkey: Optional[Tuple[int, ...]]
+    pixels: np.ndarray  # (frames, height, width, 4) uint8, RGBX
+    masks: Optional[np.ndarray]  # (frames, height) uint64, see hitboxes.Hitboxes
+
+
+_atlas: Optional[Dict[Tuple, AtlasEntry]] = None
+
+
+def atlas_path() -> str:
+    """
+    Get the path of the atlas shipped with the package.
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), ATLAS_FILE)
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _parse(data: np.ndarray) -> Dict[Tuple, AtlasEntry]:
+    if bytes(data[: len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a sprite atlas")
+    start = len(MAGIC) + 4
+    (index_length,) = struct.unpack("<I", bytes(data[len(MAGIC) : start]))
+    index = json.loads(bytes(data[start : start + index_length]))
+
+    atlas = {}
+    for sheet in index:
+        frames, (width, height) = sheet["frames"], sheet["size"]
+        pixels_length = frames * height * width * 4
+        pixels = data[sheet["pixels"] : sheet["pixels"] + pixels_length]
+        masks = None
+        if sheet["masks"] is not None:
+            masks = (
+                data[sheet["masks"] : sheet["masks"] + frames * height * 8]
+                .view("<u8")
+                .reshape(frames, height)
+            )
+        colorkey = sheet["colorkey"]
+        atlas[tuple(sheet["sheet"])] = AtlasEntry(
+            (width, height),
+            None if colorkey is None else tuple(colorkey),
+            pixels.reshape(frames, height, width, 4),
+            masks,
+        )
+    return atlas
+
+
+def load_atlas() -> Dict[Tuple, AtlasEntry]:
+    """
+    Get the baked sprite sheets, memory-mapping the atlas on first use.
+
+    Returns:
+        dict: The entry of each baked sheet, keyed by (sheetname, nx, ny, scalex,
+            scaley). Empty if the package ships no atlas.
+    """
+    global _atlas
+    if _atlas is None:
+        path = atlas_path()
+        if os.path.exists(path):
+            data = np.asarray(np.memmap(path, dtype=np.uint8, mode="r"))
+        else:
+            # Packages that are not installed as plain files can't be mapped
+            try:
+                raw = pkgutil.get_data("chrome_trex", ATLAS_FILE)
+            except OSError:
+                raw = None
+            data = None if raw is None else np.frombuffer(raw, dtype=np.uint8)
+        _atlas = {} if data is None else _parse(data)
+    return _atlas
+
+
+def get_atlas_entry(sheetname, nx, ny, scalex=-1, scaley=-1) -> Optional[AtlasEntry]:
+    """
+    Get a baked sprite sheet, or None if the sheet isn't in the atlas.
+
+    The arguments are the same as `helpers.get_sprite_sheet`, with a colorkey of -1.
+    """
+    return load_atlas().get((sheetname, nx, ny, scalex, scaley))
+
+
+def bake_atlas(path: str, sheets: List[Tuple] = BAKED_SHEETS) -> None:
+    """
+    Decode, slice and scale sprite sheets with pygame and write them as an atlas.
+
+    Args:
+        path (str): Path of the atlas file to write.
+        sheets (list, optional): The (sheetname, nx, ny, scalex, scaley) of the
+            sheets to bake. Defaults to every sheet used by the game.
+    """
+    import pygame
+    from chrome_trex.helpers import load_sprite_sheet
+    from chrome_trex.hitboxes import MAX_MASK_WIDTH, mask_rows
+
+    index = []
+    blocks = []
+    offset = 0
+    for sheet in sheets:
+        images, rect = load_sprite_sheet(*sheet, -1)
+        width, height = rect.size
+        pixels = b"".join(pygame.image.tobytes(image, "RGBX") for image in images)
+        masks = None
+        if width <= MAX_MASK_WIDTH:
+            masks = np.stack(
+                [mask_rows(pygame.mask.from_surface(image)) for image in images]
+            ).astype("<u8")
+        colorkey = images[0].get_colorkey()
+
+        entry = {
+            "sheet": list(sheet),
+            "frames": len(images),
+            "size": [width, height],
+            "colorkey": None if colorkey is None else list(colorkey),
+        }
+        for name, block in [("pixels", pixels), ("masks", masks)]:
+            if block is None:
+                entry[name] = None
+                continue
+            block = bytes(block)
+            entry[name] = offset
+            blocks.append(block + b"\0" * (_align(len(block)) - len(block)))
+            offset += _align(len(block))
+        index.append(entry)
+
+    # Block offsets are relative to the end of the header, whose length depends on
+    # the offsets written in the index
+    header_length = 0
+    while True:
+        absolute_index = [
+            {
+                **entry,
+                **{
+                    name: entry[name] + header_length
+                    for name in ("pixels", "masks")
+                    if entry[name] is not None
+                },
+            }
+            for entry in index
+        ]
+        index_bytes = json.dumps(absolute_index).encode()
+        header = MAGIC + struct.pack("<I", len(index_bytes)) + index_bytes
+        if _align(len(header)) == header_length:
+            break
+        header_length = _align(len(header))
+
+    # Processes may have the current atlas mapped, so it is replaced, not rewritten
+    with open(path + ".tmp", "wb") as file:
+        file.write(header + b"\0" * (header_length - len(header)))
+        for block in blocks:
+            file.write(block)
+    os.replace(path + ".tmp", path)
@@ -0,0 +1,19 @@
+"""
+Bake the sprite atlas shipped with the package, runnable with
+`python -m chrome_trex.bake`.
+
+The atlas must be baked again whenever a sprite, or the size at which the game
+uses it, changes.
+"""
+
+from chrome_trex.atlas import BAKED_SHEETS, atlas_path, bake_atlas
+
+
+def main() -> None:
+    path = atlas_path()
+    bake_atlas(path)
+    print(f"{len(BAKED_SHEETS)} sprite sheets baked into {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Benchmarks for the game loop, runnable with `python -m chrome_trex.bench`.
+
+Every case drives a game with fixed seeds and fps=0, and reports its throughput
+(frames and steps of alive dinosaurs per second), the latency of `get_state`,
+`get_state_array` and `reset`, and its peak memory. The results are printed as
+a table and written as JSON, so that they can be compared between versions.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+# The benchmarks must run on machines without a display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+# Keep the pygame banner out of the JSON report written to stdout
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+from chrome_trex.constants import (  # noqa: E402
+    ACTION_DOWN,
+    ACTION_FORWARD,
+    ACTION_UP,
+)
+from chrome_trex.core.dino_game import DinoGame  # noqa: E402
+from chrome_trex.core.multi_dino_game import MultiDinoGame  # noqa: E402
+from chrome_trex.core.objects.cactus import Cactus  # noqa: E402
+from chrome_trex.core.objects.ptera import Ptera  # noqa: E402
+
+DEFAULT_DINO_COUNTS = [1, 10, 100, 1000]
+
+
+def _version() -> str:
+    try:
+        from importlib.metadata import version
+
+        return version("chrome-trex")
+    except Exception:
+        return "unknown"
+
+
+def _make_game(dino_count: int, render: bool, seed: int, single: bool):
+    if single:
+        return DinoGame(fps=0, render=render, seed=seed)
+    return MultiDinoGame(dino_count, fps=0, render=render, seed=seed)
+
+
+def _make_actions(frames: int, dino_count: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.choice(
+        [ACTION_FORWARD, ACTION_UP, ACTION_DOWN],
+        size=(frames, dino_count),
+        p=[0.9, 0.05, 0.05],
+    ).astype(np.int8)
+
+
+def _mean_latency(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def bench_game(
+    dino_count: int,
+    render: bool,
+    frames: int,
+    seed: int,
+    single: bool = False,
+    repeat: int = 100,
+) -> Dict:
+    """
+    Benchmark a single game configuration.
+
+    Args:
+        dino_count (int): Number of dinosaurs in the game.
+        render (bool): Whether the game is rendered.
+        frames (int): Number of frames to simulate. Games that are over are reset
+            (outside of the timed section) and keep going.
+        seed (int): Seed of the game and of the random actions.
+        single (bool, optional): Whether to drive a DinoGame instead of a
+            MultiDinoGame. Defaults to False.
+        repeat (int, optional): Number of calls used to measure the latency of
+            get_state, get_state_array and reset. Defaults to 100.
+
+    Returns:
+        dict: The measurements of this configuration.
+    """
+    actions = _make_actions(frames, dino_count, seed)
+
+    start = time.perf_counter()
+    game = _make_game(dino_count, render, seed, single)
+    construct_time = time.perf_counter() - start
+
+    step_time = 0.0
+    dino_steps = 0
+    episodes = 1
+    for frame_actions in actions:
+        if game.game_over:
+            game.reset()
+            episodes += 1
+        action = frame_actions[0] if single else frame_actions
+        start = time.perf_counter()
+        game.step(action)
+        step_time += time.perf_counter() - start
+        dino_steps += game.dinos.alive_count
+
+    get_state_time = _mean_latency(game.get_state, repeat)
+    buffer = np.empty((10,) if single else (dino_count, 10), dtype=np.float32)
+    get_state_array_time = _mean_latency(lambda: game.get_state_array(buffer), repeat)
+    reset_time = _mean_latency(game.reset, repeat)
+    game.close()
+
+    # Memory is traced in a separate, shorter run, as tracing slows everything
+    tracemalloc.start()
+    game = _make_game(dino_count, render, seed, single)
+    for frame_actions in actions[: min(frames, 200)]:
+        game.step(frame_actions[0] if single else frame_actions)
+        game.get_state()
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    game.close()
+
+    return {
+        "game": "DinoGame" if single else "MultiDinoGame",
+        "dino_count": dino_count,
+        "render": render,
+        "frames": frames,
+        "episodes": episodes,
+        "construct_ms": construct_time * 1e3,
+        "frames_per_sec": frames / step_time,
+        "dino_steps_per_sec": dino_steps / step_time,
+        "get_state_us": get_state_time * 1e6,
+        "get_state_array_us": get_state_array_time * 1e6,
+        "reset_us": reset_time * 1e6,
+        "peak_memory_kb": peak_memory / 1024,
+    }
+
+
+def bench_spawn(count: int, seed: int) -> Dict:
+    """
+    Benchmark the construction of obstacles.
+
+    Args:
+        count (int): Number of obstacles of each type to create.
+        seed (int): Seed of the random generator given to the obstacles.
+
+    Returns:
+        dict: The mean time to create a cactus and a ptera.
+    """
+    rng = random.Random(seed)
+    group = []
+    results = {}
+    for name, spawn in [
+        ("cactus_us", lambda: group.append(Cactus(4, 40, 40, rng))),
+        ("ptera_us", lambda: group.append(Ptera(4, 46, 40, rng))),
+    ]:
+        spawn()  # Load the hitboxes before timing
+        results[name] = _mean_latency(spawn, count) * 1e6
+        group.clear()
+    return results
+
+
+def run(
+    dino_counts: List[int],
+    renders: List[bool],
+    frames: int,
+    seed: int,
+) -> Dict:
+    """
+    Run every benchmark configuration.
+
+    Returns:
+        dict: The environment and the results of every configuration.
+    """
+    results = []
+    for render in renders:
+        results.append(bench_game(1, render, frames, seed, single=True))
+        for dino_count in dino_counts:
+            results.append(bench_game(dino_count, render, frames, seed))
+    return {
+        "version": _version(),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "seed": seed,
+        "results": results,
+        "spawn": bench_spawn(1000, seed),
+    }
+
+
+def format_table(report: Dict) -> str:
+    """
+    Format the results of a run as a human-readable table.
+    """
+    header = (
+        f"{'game':<14}{'dinos':>6}{'render':>8}{'frames/s':>11}"
+        f"{'dino-steps/s':>14}{'state us':>10}{'array us':>10}"
+        f"{'reset us':>10}{'peak KiB':>10}"
+    )
+    lines = [header, "-" * len(header)]
+    for r in report["results"]:
+        lines.append(
+            f"{r['game']:<14}{r['dino_count']:>6}{str(r['render']):>8}"
+            f"{r['frames_per_sec']:>11.0f}{r['dino_steps_per_sec']:>14.0f}"
+            f"{r['get_state_us']:>10.1f}{r['get_state_array_us']:>10.1f}"
+            f"{r['reset_us']:>10.1f}{r['peak_memory_kb']:>10.0f}"
+        )
+    spawn = report["spawn"]
+    lines.append(
+        f"spawn: cactus {spawn['cactus_us']:.1f} us, ptera {spawn['ptera_us']:.1f} us"
+    )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m chrome_trex.bench", description=__doc__.strip()
+    )
+    parser.add_argument(
+        "--dino-counts",
+        type=int,
+        nargs="+",
+        default=DEFAULT_DINO_COUNTS,
+        help="Population sizes to benchmark (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--render",
+        choices=["on", "off", "both"],
+        default="both",
+        help="Benchmark rendered games, headless games or both (default: both).",
+    )
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=1000,
+        help="Frames simulated by each configuration (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed of the games (default: 0)."
+    )
+    parser.add_argument(
+        "--output",
+        default="bench_results.json",
+        help="Path of the JSON report, or - for stdout (default: %(default)s).",
+    )
+    args = parser.parse_args(argv)
+
+    renders = {"on": [True], "off": [False], "both": [False, True]}[args.render]
+    report = run(args.dino_counts, renders, args.frames, args.seed)
+
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print(format_table(report))
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,3 +9,6 @@ BACKGROUND_COL = WHITE
 WIDTH, HEIGHT = 600, 150
 
 SPRITE_SCALE_Y = int(11 * 6 / 5)
+
+# Y coordinate of the bottom of a dinosaur standing on the ground
+GROUND_LEVEL = int(0.98 * HEIGHT)
@@ -0,0 +1,37 @@
+import time
+
+
+class FrameClock:
+    """
+    A frame rate limiter behaving like `pygame.time.Clock`, without pygame.
+    """
+
+    def __init__(self):
+        self._last_tick = time.perf_counter()
+
+    def ready(self, fps: float) -> bool:
+        """
+        Whether a call to tick(fps) would return without waiting.
+        """
+        return fps <= 0 or time.perf_counter() - self._last_tick >= 1 / fps
+
+    def tick(self, fps: float = 0) -> float:
+        """
+        Wait so that successive calls are at least 1 / fps seconds apart.
+
+        Args:
+            fps (float, optional): The frame rate to limit to. Defaults to 0, in
+                which case the clock never waits.
+
+        Returns:
+            float: The number of milliseconds since the previous call.
+        """
+        now = time.perf_counter()
+        if fps > 0:
+            delay = self._last_tick + 1 / fps - now
+            if delay > 0:
+                time.sleep(delay)
+                now = time.perf_counter()
+        elapsed = now - self._last_tick
+        self._last_tick = now
+        return elapsed * 1000
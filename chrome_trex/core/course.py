@@ -0,0 +1,174 @@
+"""
+Obstacle courses generated ahead of an episode.
+
+The obstacles and clouds of an episode only depend on the game's random
+generator, never on the dinosaurs. `generate_course` draws them exactly like a
+game seeded the same way would, frame by frame, and stores them as compact
+arrays. A game using the course (see `MultiDinoGame.use_course`) then spawns
+them without drawing any random number, and can look ahead at the coming
+obstacles.
+"""
+
+import random
+from typing import NamedTuple, Optional
+
+import numpy as np
+from chrome_trex.constants import HEIGHT, WIDTH
+from chrome_trex.core.rect import Rect
+from chrome_trex.hitboxes import get_hitboxes
+
+# Obstacle kinds
+CACTUS = 0
+PTERA = 1
+
+CACTUS_SHEET = ("cacti-small.png", 3, 1, 40, 40)
+PTERA_SHEET = ("ptera.png", 2, 1, 46, 40)
+CLOUD_SHEET = ("cloud.png", 1, 1, int(90 * 30 / 42), 30)
+
+# An obstacle spawned at the start of a frame; variant is the cactus variant or
+# the ptera height index
+OBSTACLE_DTYPE = np.dtype([("frame", "<u4"), ("kind", "u1"), ("variant", "u1")])
+# A cloud spawned at the given height
+CLOUD_DTYPE = np.dtype([("frame", "<u4"), ("y", "<i2")])
+
+
+def roll_obstacle(
+    rng: random.Random, obstacle_count: int, last_obstacle: Optional[Rect], speed: int
+) -> Optional[int]:
+    """
+    Draw the kind of the obstacle spawned in a frame, if any.
+
+    Args:
+        rng (random.Random): The random generator of the game.
+        obstacle_count (int): Number of obstacles on the screen.
+        last_obstacle (Rect): Rect of the last spawned obstacle, if it is still
+            on the screen.
+        speed (int): The game speed.
+
+    Returns:
+        int: CACTUS, PTERA, or None if no obstacle spawns.
+    """
+    if obstacle_count >= 3:
+        return None
+    if obstacle_count == 0:
+        return CACTUS if rng.randrange(0, 50) > 24 else PTERA
+    if last_obstacle is None:
+        return None
+    min_distance = 200 * speed
+    if (
+        last_obstacle.right < WIDTH * 0.7
+        and rng.randrange(0, 50) > 24
+        and last_obstacle.left < WIDTH - min_distance
+    ):
+        return CACTUS
+    if (
+        last_obstacle.right < WIDTH * 0.7
+        and rng.randrange(0, 50) <= 24
+        and last_obstacle.left < WIDTH - min_distance
+    ):
+        return PTERA
+    return None
+
+
+def roll_variant(rng: random.Random) -> int:
+    """
+    Draw the variant of a cactus, or the height index of a ptera.
+    """
+    return rng.randrange(0, 3)
+
+
+def roll_cloud(rng: random.Random, cloud_count: int) -> Optional[int]:
+    """
+    Draw the height of the cloud spawned in a frame, if any.
+    """
+    if cloud_count < 5 and rng.randrange(0, 300) == 10:
+        return rng.randrange(HEIGHT // 5, HEIGHT // 2)
+    return None
+
+
+class ObstacleCourse(NamedTuple):
+    """
+    The obstacles and clouds of an episode, in spawn order.
+
+    The arrays are read-only, so a course can be shared by any number of games.
+    No obstacle spawns after the last frame of the course.
+    """
+
+    obstacles: np.ndarray  # OBSTACLE_DTYPE
+    clouds: np.ndarray  # CLOUD_DTYPE
+    frames: int
+    max_game_speed: int
+
+
+def generate_course(
+    seed: Optional[int] = None,
+    frames: int = 100_000,
+    max_game_speed: int = 12,
+    rng: Optional[random.Random] = None,
+) -> ObstacleCourse:
+    """
+    Generate the obstacle course of an episode.
+
+    The course is the one played by a game with the same maximum game speed
+    after `reset(seed)`, whatever its dinosaurs do.
+
+    Args:
+        seed (int, optional): Seed of the course. Defaults to None, in which case
+            the course is drawn from the system.
+        frames (int, optional): Number of frames covered by the course. Defaults
+            to 100000.
+        max_game_speed (int, optional): Maximum game speed. Defaults to 12.
+        rng (random.Random, optional): Generator to draw the course from instead
+            of seeding a new one; it is advanced as the game's would be.
+            Defaults to None.
+
+    Returns:
+        ObstacleCourse: The course.
+    """
+    if rng is None:
+        rng = random.Random(seed)
+    widths = {
+        CACTUS: get_hitboxes(*CACTUS_SHEET).size[0],
+        PTERA: get_hitboxes(*PTERA_SHEET).size[0],
+    }
+    cloud_width = get_hitboxes(*CLOUD_SHEET).size[0]
+
+    obstacles = []
+    clouds = []
+    on_screen = []
+    cloud_lefts = []
+    last_obstacle = None
+    speed = 4
+    for frame in range(frames):
+        if not on_screen:
+            last_obstacle = None
+        kind = roll_obstacle(rng, len(on_screen), last_obstacle, speed)
+        if kind is not None:
+            obstacles.append((frame, kind, roll_variant(rng)))
+            last_obstacle = Rect(WIDTH + widths[kind], 0, widths[kind], 1)
+            on_screen.append(last_obstacle)
+        y = roll_cloud(rng, len(cloud_lefts))
+        if y is not None:
+            clouds.append((frame, y))
+            cloud_lefts.append(WIDTH)
+
+        # Move everything like the game does, dropping what left the screen
+        for rect in on_screen:
+            rect.left -= speed
+        on_screen = [rect for rect in on_screen if rect.right >= 0]
+        if last_obstacle is not None and last_obstacle.right < 0:
+            last_obstacle = None
+        cloud_lefts = [left - 1 for left in cloud_lefts if left - 1 + cloud_width >= 0]
+
+        if frame % 700 == 699 and speed < max_game_speed:
+            speed += 1
+
+    course = ObstacleCourse(
+        np.array(obstacles, dtype=OBSTACLE_DTYPE),
+        np.array(clouds, dtype=CLOUD_DTYPE),
+        frames,
+        max_game_speed,
+    )
+    course.obstacles.flags.writeable = False
+    course.clouds.flags.writeable = False
+    return course
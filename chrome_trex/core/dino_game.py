@@ -1,5 +1,6 @@
-from typing import List, Literal
+from typing import List, Literal, Optional, Tuple
 
+import numpy as np
 from chrome_trex.core.multi_dino_game import MultiDinoGame
 
 
@@ -9,30 +10,59 @@ class DinoGame(MultiDinoGame):
       T-Rex Rush.
     """
 
-    def __init__(self, fps: int = 60, max_game_speed: int = 12):
+    def __init__(
+        self,
+        fps: int = 60,
+        max_game_speed: int = 12,
+        render: bool = True,
+        seed: Optional[int] = None,
+        render_fps: float = 0,
+        render_every: int = 1,
+    ):
         """
         Initialize the single-player game with given FPS and maximum game speed.
 
         Set fps to zero so the game goes at the maximum fps possible.
 
+        Set render to False to run the game headless (no window, no drawing).
+
         Args:
             fps (int, optional): Frames per second for the game. Defaults to 60.
             max_game_speed (int, optional): Maximum game speed. Defaults to 12.
+            render (bool, optional): Whether to open a window and draw the game.
+                Defaults to True.
+            seed (int, optional): Seed of the game's random generator. Defaults to
+                None, in which case the generator is seeded from the system.
+            render_fps (float, optional): Maximum number of frames drawn per
+                second, whatever the simulation rate. Defaults to 0, in which case
+                every frame is drawn.
+            render_every (int, optional): Only draw one frame out of render_every.
+                Defaults to 1.
         """
-        super().__init__(1, fps, max_game_speed)
+        super().__init__(1, fps, max_game_speed, render, seed, render_fps, render_every)
 
-    def step(self, action: Literal[0, 1, 2]) -> None:
+    def step(
+        self, action: Literal[0, 1, 2], repeat: int = 1, render: bool = True
+    ) -> Tuple[int, bool]:
         """
         Execute a single game step for the player dinosaur based on the provided action.
 
+        With repeat > 1, the action is taken for that many frames (or until the
+        dinosaur dies) and only the last frame is drawn.
+
         Args:
             action (int): The action for the dinosaur
                 (e.g., ACTION_FORWARD, ACTION_UP, ACTION_DOWN = 0, 1, 2).
+            repeat (int, optional): Number of frames to advance. Defaults to 1.
+            render (bool, optional): Whether to draw the last frame, for games
+                created with render=True. Defaults to True.
 
         Returns:
-            None
+            tuple: The score gained during the step and whether the dinosaur is
+                dead.
         """
-        return super().step([action])
+        score_gained, dead = super().step([action], repeat, render)
+        return int(score_gained[0]), bool(dead[0])
 
     def get_score(self) -> int:
         """
@@ -61,3 +91,21 @@ class DinoGame(MultiDinoGame):
                     dinosaur.
         """
         return super().get_state()[0]
+
+    def get_state_array(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Get the current game state for the player dinosaur as a NumPy array.
+
+        Args:
+            out (np.ndarray, optional): A preallocated float32 array of shape (10,)
+                to write the state into. Defaults to None.
+
+        Returns:
+            np.ndarray: A (10,) float32 array with the same values as `get_state`.
+        """
+        if out is None:
+            return super().get_state_array()[0]
+        if out.shape != (10,) or out.dtype != np.float32:
+            raise ValueError("out must be a float32 array of shape (10,)")
+        super().get_state_array(out.reshape(1, 10))
+        return out
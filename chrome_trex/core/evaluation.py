@@ -0,0 +1,219 @@
+"""
+Fitness evaluation of whole populations of policies, e.g. for neuro-evolution.
+"""
+
+import time
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from chrome_trex.core.course import ObstacleCourse
+from chrome_trex.core.multi_dino_game import MultiDinoGame
+
+# A batched policy: called with the (n, 10) states of n alive dinosaurs and their
+# (n,) indices in the population, it returns their (n,) actions or their (n, 3)
+# action values, the highest value of each row being the action taken
+BatchedPolicy = Callable[[np.ndarray, np.ndarray], np.ndarray]
+# The layers of a population of networks, one per dinosaur: a (dino_count, in,
+# out) weight array, optionally paired with a (dino_count, out) bias array
+Layer = Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]
+
+
+class PopulationFitness(NamedTuple):
+    """
+    The fitness of every dinosaur of a population on each evaluated course, and
+    how fast the evaluation ran.
+
+    The fitness arrays have a (courses, dino_count) shape.
+    """
+
+    scores: np.ndarray
+    frames_survived: np.ndarray
+    obstacles_passed: np.ndarray
+    # Frames simulated, summed over the courses, and frames survived, summed
+    # over the dinosaurs
+    frames: int
+    dino_steps: int
+    seconds: float
+    policy_seconds: float
+
+    @property
+    def frames_per_second(self) -> float:
+        return self.frames / self.seconds if self.seconds else 0.0
+
+    @property
+    def dino_steps_per_second(self) -> float:
+        return self.dino_steps / self.seconds if self.seconds else 0.0
+
+
+class StackedPolicy:
+    """
+    A population of feed-forward networks, one per dinosaur, evaluated as a
+    batched policy.
+
+    Each layer computes activation(x @ W + b) for every alive dinosaur with its
+    own weights, in a single batched matrix product. The last layer has no
+    activation and one output per action.
+    """
+
+    def __init__(
+        self,
+        layers: Sequence[Layer],
+        activation: Callable[[np.ndarray], np.ndarray] = np.tanh,
+    ):
+        """
+        Stack the layers of the networks.
+
+        Args:
+            layers (list): The layers of the networks, from the input (10
+                features) to the output (3 action values). Each one is a
+                (dino_count, in, out) weight array, or a (weights, biases) pair
+                with (dino_count, out) biases.
+            activation (callable, optional): Activation of the hidden layers.
+                Defaults to np.tanh.
+        """
+        self.layers = []
+        for layer in layers:
+            weights, biases = layer if isinstance(layer, tuple) else (layer, None)
+            if biases is not None:
+                biases = np.asarray(biases)
+            self.layers.append((np.asarray(weights), biases))
+        self.activation = activation
+        self.dino_count = len(self.layers[0][0])
+        self._everyone = np.arange(self.dino_count)
+
+    def __call__(self, states: np.ndarray, indices: np.ndarray) -> np.ndarray:
+        """
+        Get the action values of the given dinosaurs.
+        """
+        # The rows of several games can be batched together, so the whole stack
+        # is only used as is when the rows are exactly the population, in order
+        everyone = np.array_equal(indices, self._everyone)
+        x = states
+        for i, (weights, biases) in enumerate(self.layers):
+            if not everyone:
+                weights = weights[indices]
+                biases = None if biases is None else biases[indices]
+            x = np.matmul(x[:, None, :], weights)[:, 0, :]
+            if biases is not None:
+                x += biases
+            if i < len(self.layers) - 1:
+                x = self.activation(x)
+        return x
+
+
+def _count_passed(game: MultiDinoGame, passed: np.ndarray) -> None:
+    """
+    Credit the alive dinosaurs with the obstacles that just went past them.
+    """
+    left = game.dinos.left
+    crossed = 0
+    for obstacle in game.cacti + game.pteras:
+        right = obstacle.rect.right
+        if left + obstacle.movement[0] <= right < left:
+            crossed += 1
+    if crossed:
+        passed[game.dinos.alive] += crossed
+
+
+def evaluate_population(
+    policy: Union[BatchedPolicy, Sequence[Layer]],
+    seeds: Sequence[Union[int, ObstacleCourse]] = (0,),
+    max_frames: int = 10_000,
+    dino_count: Optional[int] = None,
+    max_game_speed: int = 12,
+) -> PopulationFitness:
+    """
+    Evaluate a population of policies on one or more courses.
+
+    A headless game is played on each course, every dinosaur being driven by its
+    own policy. The games are advanced together: every frame, the states of the
+    alive dinosaurs of every game go through a single batched forward pass.
+    A game stops as soon as all its dinosaurs are dead or after max_frames
+    frames.
+
+    Args:
+        policy (callable or list): A batched policy (see `BatchedPolicy`), or the
+            stacked layers of a population of networks (see `StackedPolicy`).
+        seeds (list, optional): The courses to play, as seeds or as
+            pre-generated courses (see `generate_course`). Defaults to (0,).
+        max_frames (int, optional): Maximum number of frames played on each
+            course. Defaults to 10000.
+        dino_count (int, optional): Size of the population. Defaults to None, in
+            which case it is given by the stacked layers.
+        max_game_speed (int, optional): Maximum game speed of the games played on
+            seeds. Defaults to 12.
+
+    Returns:
+        PopulationFitness: The score, number of frames survived and number of
+            obstacles passed by each dinosaur on each course.
+    """
+    if not callable(policy):
+        policy = StackedPolicy(policy)
+    if dino_count is None:
+        dino_count = getattr(policy, "dino_count", None)
+        if dino_count is None:
+            raise ValueError("dino_count is required with a callable policy")
+
+    start = time.perf_counter()
+    games: List[MultiDinoGame] = []
+    for seed in seeds:
+        if isinstance(seed, ObstacleCourse):
+            game = MultiDinoGame(
+                dino_count, fps=0, max_game_speed=seed.max_game_speed, render=False
+            )
+            game.use_course(seed)
+        else:
+            game = MultiDinoGame(
+                dino_count,
+                fps=0,
+                max_game_speed=max_game_speed,
+                render=False,
+                seed=seed,
+            )
+        games.append(game)
+    # Dinosaurs are already counted alive in the frame played by reset
+    initial_counters = [game.dinos.counter.copy() for game in games]
+
+    actions = np.zeros((len(games), dino_count), dtype=np.int8)
+    passed = np.zeros((len(games), dino_count), dtype=np.int64)
+    frames = 0
+    dino_steps = 0
+    policy_seconds = 0.0
+    running = [i for i, game in enumerate(games) if not game.game_over]
+    for _ in range(max_frames):
+        if not running:
+            break
+        indices = [games[i].dinos.alive for i in running]
+        states = np.concatenate(
+            [games[i].get_state_array(alive_only=True) for i in running]
+        )
+        inference_start = time.perf_counter()
+        choices = np.asarray(policy(states, np.concatenate(indices)))
+        if choices.ndim == 2:
+            choices = choices.argmax(axis=1)
+        policy_seconds += time.perf_counter() - inference_start
+
+        offsets = np.cumsum([len(alive) for alive in indices])[:-1]
+        for i, alive, game_actions in zip(running, indices, np.split(choices, offsets)):
+            actions[i, alive] = game_actions
+            games[i].step(actions[i])
+            _count_passed(games[i], passed[i])
+        frames += len(running)
+        dino_steps += len(states)
+        running = [i for i in running if not games[i].game_over]
+
+    scores = np.stack([game.dinos.score for game in games])
+    frames_survived = np.stack(
+        [game.dinos.counter - counter for game, counter in zip(games, initial_counters)]
+    )
+    for game in games:
+        game.close()
+    return PopulationFitness(
+        scores,
+        frames_survived,
+        passed,
+        frames,
+        dino_steps,
+        time.perf_counter() - start,
+        policy_seconds,
+    )
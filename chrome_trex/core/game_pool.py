@@ -0,0 +1,250 @@
+import multiprocessing
+import os
+import traceback
+from typing import Optional
+
+import numpy as np
+from chrome_trex.core.multi_dino_game import MultiDinoGame
+
+
+def _shared_array(buffer, dtype, shape) -> np.ndarray:
+    return np.frombuffer(buffer, dtype=dtype).reshape(shape)
+
+
+def _worker(
+    connection,
+    start: int,
+    stop: int,
+    num_games: int,
+    dino_count: int,
+    max_game_speed: int,
+    seed: Optional[int],
+    buffers,
+) -> None:
+    """
+    Run the games [start, stop) of a pool, answering the commands of the parent.
+
+    Actions are read from and results written to the shared buffers; only the
+    commands and the acknowledgements go through the connection. The i-th game
+    is seeded with seed + i.
+    """
+    actions_buffer, states_buffer, scores_buffer, game_over_buffer = buffers
+    actions = _shared_array(actions_buffer, np.int8, (num_games, dino_count))
+    states = _shared_array(states_buffer, np.float32, (num_games, dino_count, 10))
+    scores = _shared_array(scores_buffer, np.int64, (num_games, dino_count))
+    game_over = _shared_array(game_over_buffer, np.bool_, (num_games,))
+
+    def game_seed(i, seed):
+        return None if seed is None else seed + i
+
+    def write_results():
+        for i, game in games.items():
+            game.get_state_array(states[i])
+            scores[i] = game.dinos.score
+            game_over[i] = game.game_over
+
+    # Failing to create the games is reported like a failing command, then the
+    # worker stops
+    try:
+        games = {
+            i: MultiDinoGame(
+                dino_count,
+                fps=0,
+                max_game_speed=max_game_speed,
+                render=False,
+                seed=game_seed(i, seed),
+            )
+            for i in range(start, stop)
+        }
+        write_results()
+    except Exception:
+        connection.send(traceback.format_exc())
+        connection.close()
+        return
+    connection.send(None)
+    while True:
+        command, argument = connection.recv()
+        try:
+            if command == "step":
+                for i, game in games.items():
+                    game.step(actions[i])
+            elif command == "reset":
+                for i, game in games.items():
+                    game.reset(game_seed(i, argument))
+            elif command == "close":
+                for game in games.values():
+                    game.close()
+                connection.send(None)
+                break
+            write_results()
+        except Exception:
+            connection.send(traceback.format_exc())
+        else:
+            connection.send(None)
+    connection.close()
+
+
+class DinoGamePool:
+    """
+    A class to run several headless games of T-Rex Rush across CPU cores.
+
+    The games are split between worker processes. Actions, states, scores and
+    game over flags are exchanged through shared memory buffers, and the pool
+    exposes the same step/reset/get_state/get_scores interface as a single game,
+    with an extra leading dimension for the games.
+    """
+
+    def __init__(
+        self,
+        num_games: int,
+        dino_count: int = 1,
+        num_workers: Optional[int] = None,
+        max_game_speed: int = 12,
+        seed: Optional[int] = None,
+        start_method: Optional[str] = None,
+    ):
+        """
+        Start the worker processes and create the games.
+
+        Args:
+            num_games (int): Number of independent games.
+            dino_count (int, optional): Number of dinosaurs in each game.
+                Defaults to 1.
+            num_workers (int, optional): Number of worker processes. Defaults to
+                None, in which case one worker per CPU core is used (but never
+                more than one per game).
+            max_game_speed (int, optional): Maximum game speed. Defaults to 12.
+            seed (int, optional): Seed of the first game; the i-th game is seeded
+                with seed + i. Defaults to None, in which case the games are
+                seeded from the system.
+            start_method (str, optional): The multiprocessing start method.
+                Defaults to None, in which case the platform's default is used.
+        """
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        num_workers = max(1, min(num_workers, num_games))
+        self.num_games = num_games
+        self.dino_count = dino_count
+
+        context = multiprocessing.get_context(start_method)
+        buffers = (
+            context.RawArray("b", num_games * dino_count),
+            context.RawArray("f", num_games * dino_count * 10),
+            context.RawArray("q", num_games * dino_count),
+            context.RawArray("b", num_games),
+        )
+        self._actions = _shared_array(buffers[0], np.int8, (num_games, dino_count))
+        self._states = _shared_array(
+            buffers[1], np.float32, (num_games, dino_count, 10)
+        )
+        self._scores = _shared_array(buffers[2], np.int64, (num_games, dino_count))
+        self._game_over = _shared_array(buffers[3], np.bool_, (num_games,))
+
+        self._connections = []
+        self._processes = []
+        bounds = np.linspace(0, num_games, num_workers + 1).astype(int)
+        for start, stop in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            parent_connection, child_connection = context.Pipe()
+            process = context.Process(
+                target=_worker,
+                args=(
+                    child_connection,
+                    start,
+                    stop,
+                    num_games,
+                    dino_count,
+                    max_game_speed,
+                    seed,
+                    buffers,
+                ),
+                daemon=True,
+            )
+            process.start()
+            child_connection.close()
+            self._connections.append(parent_connection)
+            self._processes.append(process)
+        try:
+            self._wait()
+        except RuntimeError:
+            # Some workers couldn't create their games: stop all of them
+            for process in self._processes:
+                process.terminate()
+                process.join()
+            for connection in self._connections:
+                connection.close()
+            self._processes = []
+            self._connections = []
+            raise
+
+    def _send(self, command: str, argument=None) -> None:
+        for connection in self._connections:
+            connection.send((command, argument))
+        self._wait()
+
+    def _wait(self) -> None:
+        errors = [connection.recv() for connection in self._connections]
+        errors = [error for error in errors if error is not None]
+        if errors:
+            raise RuntimeError(f"A game pool worker failed:\n{errors[0]}")
+
+    @property
+    def game_over(self) -> np.ndarray:
+        """
+        A (num_games,) bool array telling which games are over.
+        """
+        return self._game_over.copy()
+
+    def step(self, actions) -> None:
+        """
+        Advance every game by a single frame.
+
+        Args:
+            actions (array-like): A (num_games, dino_count) array with the action
+                of each dinosaur of each game
+                (e.g., ACTION_FORWARD, ACTION_UP, ACTION_DOWN = 0, 1, 2).
+        """
+        self._actions[:] = np.asarray(actions).reshape(self._actions.shape)
+        self._send("step")
+
+    def reset(self, seed: Optional[int] = None) -> None:
+        """
+        Reset every game.
+
+        Args:
+            seed (int, optional): New seed of the first game; the i-th game is
+                seeded with seed + i. Defaults to None, in which case the games'
+                generators keep their current state.
+        """
+        self._send("reset", seed)
+
+    def get_state(self) -> np.ndarray:
+        """
+        Get the current state of every dinosaur of every game.
+
+        Returns:
+            np.ndarray: A (num_games, dino_count, 10) float32 array.
+        """
+        return self._states.copy()
+
+    def get_scores(self) -> np.ndarray:
+        """
+        Get the scores of every dinosaur of every game.
+
+        Returns:
+            np.ndarray: A (num_games, dino_count) int64 array.
+        """
+        return self._scores.copy()
+
+    def close(self) -> None:
+        """
+        Close every game and stop the worker processes.
+        """
+        if not self._processes:
+            return
+        self._send("close")
+        for process in self._processes:
+            process.join()
+        for connection in self._connections:
+            connection.close()
+        self._processes = []
+        self._connections = []
@@ -1,8 +1,8 @@
 import itertools
 import random
-from typing import List, Literal
+from typing import Callable, Dict, List, Literal, Optional, Tuple, Union
 
-import pygame
+import numpy as np
 from chrome_trex.constants import (  # noqa: F401
     ACTION_DOWN,
     ACTION_FORWARD,
@@ -12,199 +12,666 @@ from chrome_trex.constants import (  # noqa: F401
     SPRITE_SCALE_Y,
     WIDTH,
 )
+from chrome_trex.core.clock import FrameClock
+from chrome_trex.core.course import (
+    CACTUS,
+    ObstacleCourse,
+    roll_cloud,
+    roll_obstacle,
+    roll_variant,
+)
 from chrome_trex.core.objects.cactus import Cactus
 from chrome_trex.core.objects.cloud import Cloud
-from chrome_trex.core.objects.dino import Dino
 from chrome_trex.core.objects.ground import Ground
 from chrome_trex.core.objects.ptera import Ptera
-from chrome_trex.core.objects.scoreboard import Scoreboard
-from chrome_trex.helpers import load_sprite_sheet
+from chrome_trex.core.observation import PixelObserver
+from chrome_trex.core.population import DinoPopulation
+from chrome_trex.core.profiler import StepProfiler
+
+# Below this many rows, get_state_array builds the states of dinos in different
+# poses in Python like get_state, which is cheaper than sorting out the poses
+_SMALL_STATE_ROWS = 16
 
 
 class MultiDinoGame:
     """
     A class to manage a multi-player game of T-Rex Rush with multiple dinosaurs.
+
+    The simulation itself only needs NumPy: pygame is imported (by the renderer)
+    when the game is created with render=True.
     """
 
-    def __init__(self, dino_count: int, fps: int = 60, max_game_speed: int = 12):
+    def __init__(
+        self,
+        dino_count: int,
+        fps: int = 60,
+        max_game_speed: int = 12,
+        render: bool = True,
+        seed: Optional[int] = None,
+        render_fps: float = 0,
+        render_every: int = 1,
+    ):
         """
         Initialize the game with a given number of dinosaurs, FPS, and maximum game
           speed.
 
         Set fps to zero so the game goes at the maximum fps possible.
 
+        The simulation and the display can run at different rates: with fps=0 and
+        render_fps=30, the game is simulated as fast as possible while the window
+        is only redrawn 30 times per second, so that a live run can be watched
+        without being slowed down.
+
+        Set render to False to run the game headless: no window is opened,
+        nothing is drawn and pygame is never imported, but the game advances
+        exactly as it does when rendered.
+
+        Games created with the same seed and given the same actions play exactly
+        the same episodes.
+
         Args:
             dino_count (int): Number of dinosaur players in the game.
-            fps (int, optional): Frames per second for the game. Defaults to 60.
+            fps (int, optional): Maximum number of frames simulated per second,
+                also available as `sim_fps`. Defaults to 60.
             max_game_speed (int, optional): Maximum game speed. Defaults to 12.
+            render (bool, optional): Whether to open a window and draw the game.
+                Defaults to True.
+            seed (int, optional): Seed of the game's random generator. Defaults to
+                None, in which case the generator is seeded from the system.
+            render_fps (float, optional): Maximum number of frames drawn per
+                second, whatever the simulation rate. Defaults to 0, in which case
+                every frame is drawn.
+            render_every (int, optional): Only draw one frame out of render_every.
+                Defaults to 1.
         """
         self.high_score = 0
         self.fps = fps
+        self.render_fps = render_fps
+        self.render_every = render_every
         self.obstacles = []
         self.dino_count = dino_count
-        pygame.init()
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        self.clock = pygame.time.Clock()
-        pygame.display.set_caption("T-Rex Rush")
-        self.font = pygame.font.Font(None, 24)
+        self.render_enabled = render
+        self.renderer = None
+        self.screen = None
+        if self.render_enabled:
+            from chrome_trex.core.renderer import Renderer
+
+            self.renderer = Renderer()
+            self.screen = self.renderer.screen
+        self.clock = FrameClock()
+        self.render_clock = FrameClock()
+        # Every game draws from its own generators, so that games running in the
+        # same process don't interfere with each other. The dino colors have a
+        # generator of their own, so they never change the obstacle course.
+        self.random = random.Random(seed)
+        self.color_random = random.Random(seed)
         self.max_game_speed = max_game_speed
+        self.profiler: Optional[StepProfiler] = None
+        self.recorder = None
+        self.observer: Optional[PixelObserver] = None
+        self.course: Optional[ObstacleCourse] = None
+        self._course_obstacles: List[Tuple[int, int, int]] = []
+        self._course_clouds: List[Tuple[int, int]] = []
+        # Positions of the next obstacle and cloud of the course
+        self.course_index = 0
+        self.course_cloud_index = 0
+
+        # The world is built once; reset() brings it back to its initial state
+        # in place, keeping every loaded and colorized asset.
+        self.new_ground = Ground()
+        self.dinos = DinoPopulation(dino_count, 44, 47, rng=self.color_random)
+        self._forward_actions = np.full(dino_count, ACTION_FORWARD, dtype=np.int8)
+        self.cacti: List[Cactus] = []
+        self.pteras: List[Ptera] = []
+        self.clouds: List[Cloud] = []
+        self.last_obstacle: Optional[Union[Cactus, Ptera]] = None
+
         self.reset()
 
-    def reset(self) -> None:
+    @property
+    def sim_fps(self) -> int:
+        """
+        Maximum number of frames simulated per second, 0 for no limit (the same
+        as `fps`).
+        """
+        return self.fps
+
+    @sim_fps.setter
+    def sim_fps(self, value: int) -> None:
+        self.fps = value
+
+    def _render_due(self) -> bool:
         """
-        Reset the game state, including resetting the game speed, creating a new ground,
-        re-initializing the scoreboard, and spawning new dinosaurs and obstacles.
+        Whether the current frame should be drawn, given render_every and
+        render_fps.
         """
+        if self.render_every > 1 and self.counter % self.render_every:
+            return False
+        return self.render_clock.ready(self.render_fps)
+
+    def reset(self, seed: Optional[int] = None) -> None:
+        """
+        Reset the game state, including resetting the game speed, the ground, the
+        dinosaurs and removing every obstacle and cloud.
+
+        The existing objects are reset in place, so no asset is loaded again.
+
+        Args:
+            seed (int, optional): New seed for the game's random generator.
+                Defaults to None, in which case the generator keeps its current
+                state, so successive episodes differ.
+        """
+        if seed is not None:
+            self.random.seed(seed)
+            self.color_random.seed(seed)
         self.gamespeed = 4
         self.game_over = False
         self.obstacles = []
-        self.new_ground = Ground(-1 * self.gamespeed)
-        self.scb = Scoreboard()
-        self.highsc = Scoreboard(WIDTH * 0.78)
+        self.new_ground.reset(-1 * self.gamespeed)
         self.counter = 0
 
-        self.player_dinos = [Dino(44, 47) for _ in range(self.dino_count)]
-        self.alive_players = self.player_dinos[:]
-        self.last_dead_player = None
-        self.cacti = pygame.sprite.Group()
-        self.pteras = pygame.sprite.Group()
-        self.clouds = pygame.sprite.Group()
-        self.last_obstacle = pygame.sprite.Group()
+        self.dinos.reset()
+        self.last_dead_dino: Optional[int] = None
+        self.cacti.clear()
+        self.pteras.clear()
+        self.clouds.clear()
+        self.last_obstacle = None
+        self.course_index = 0
+        self.course_cloud_index = 0
+
+        if self.recorder:
+            self.recorder.start_episode(self.get_snapshot())
+        if self.observer:
+            self.observer.reset()
+
+        # Update the screen with the initial state. Subclasses may change the
+        # signature of step, so the multi-player one is called explicitly.
+        MultiDinoGame.step(self, self._forward_actions)
+
+    def use_course(self, course: Optional[ObstacleCourse]) -> None:
+        """
+        Play a pre-generated obstacle course (see `generate_course`) in every
+        episode, and reset the game to start it.
+
+        The obstacles and clouds of the course are spawned as scheduled, without
+        drawing any random number. Past the end of the course, nothing spawns.
+
+        Args:
+            course (ObstacleCourse): The course, generated with the maximum game
+                speed of this game, or None to go back to drawing the obstacles
+                at random.
+
+        Raises:
+            ValueError: If the course was generated with another maximum game
+                speed.
+        """
+        if course is not None and course.max_game_speed != self.max_game_speed:
+            raise ValueError(
+                f"The course was generated for a maximum game speed of "
+                f"{course.max_game_speed}, not {self.max_game_speed}"
+            )
+        self.course = course
+        self._course_obstacles = [] if course is None else course.obstacles.tolist()
+        self._course_clouds = [] if course is None else course.clouds.tolist()
+        self.reset()
+
+    def get_next_obstacles(self, count: int) -> np.ndarray:
+        """
+        Look ahead at the next obstacles of the course, which haven't spawned yet.
+
+        Args:
+            count (int): Maximum number of obstacles to return.
+
+        Returns:
+            np.ndarray: A read-only view of at most count records of the course,
+                with the spawn frame, kind (CACTUS or PTERA) and variant of each
+                obstacle.
+
+        Raises:
+            RuntimeError: If the game isn't playing a course.
+        """
+        if self.course is None:
+            raise RuntimeError("The game isn't playing a pre-generated course")
+        return self.course.obstacles[self.course_index : self.course_index + count]
+
+    def _spawn_obstacle(self, kind: int, variant: int) -> None:
+        if kind == CACTUS:
+            self._spawn(Cactus(self.gamespeed, 40, 40, variant=variant), self.cacti)
+        else:
+            self._spawn(
+                Ptera(self.gamespeed, 46, 40, height_index=variant), self.pteras
+            )
+
+    def _spawn(self, obstacle: Union[Cactus, Ptera], group: List) -> None:
+        """
+        Add a new obstacle to the game, making it the last spawned obstacle.
+        """
+        group.append(obstacle)
+        self.last_obstacle = obstacle
+        if self.profiler:
+            self.profiler.count("obstacles_spawned")
+        if self.recorder:
+            self.recorder.record_spawn(self.counter, obstacle)
+
+    def enable_profiling(
+        self, callback: Optional[Callable[[Dict], None]] = None, every: int = 1000
+    ) -> StepProfiler:
+        """
+        Start measuring the time spent in each phase of step, along with a few
+        counters (frames, collision pairs tested, sprite sheets loaded, obstacles
+        spawned and alive dinosaurs).
+
+        Args:
+            callback (callable, optional): Function called with a snapshot of the
+                measurements every `every` frames. Defaults to None.
+            every (int, optional): Number of frames between two calls to the
+                callback. Defaults to 1000.
+
+        Returns:
+            StepProfiler: The profiler collecting the measurements.
+        """
+        self.profiler = StepProfiler(callback, every)
+        return self.profiler
+
+    def disable_profiling(self) -> None:
+        """
+        Stop measuring the phases of step.
+        """
+        self.profiler = None
+
+    def get_profile(self) -> Dict:
+        """
+        Get a snapshot of the measurements taken since profiling was enabled.
+
+        Returns:
+            dict: The snapshot (see `StepProfiler.snapshot`), or an empty dict if
+                profiling is disabled.
+        """
+        if self.profiler is None:
+            return {}
+        return self.profiler.snapshot()
+
+    def start_recording(
+        self,
+        path: str,
+        scores: bool = True,
+        states: bool = False,
+        compress: Union[bool, int] = False,
+        chunk_frames: int = 1024,
+    ):
+        """
+        Start recording the game into a file, from its current state.
+
+        Every frame (the actions taken and, optionally, the resulting scores and
+        states), every obstacle spawned and every death is recorded, and each
+        reset starts a new episode. Recordings are read back with
+        `EpisodeReplayer`.
+
+        Args:
+            path (str): Path of the recording file.
+            scores (bool, optional): Whether to record the scores after each frame.
+                Defaults to True.
+            states (bool, optional): Whether to record the state of every dinosaur
+                after each frame. Defaults to False.
+            compress (bool or int, optional): Whether to compress the recording
+                with zlib, or the zlib compression level. Defaults to False.
+            chunk_frames (int, optional): Number of frames buffered in memory
+                before they are written. Defaults to 1024.
+
+        Returns:
+            EpisodeRecorder: The recorder writing the file.
+        """
+        from chrome_trex.core.recorder import EpisodeRecorder
+
+        self.stop_recording()
+        self.recorder = EpisodeRecorder(
+            path,
+            self.dino_count,
+            self.max_game_speed,
+            self.dinos.colors,
+            scores=scores,
+            states=states,
+            compress=compress,
+            chunk_frames=chunk_frames,
+        )
+        self.recorder.start_episode(self.get_snapshot())
+        return self.recorder
+
+    def stop_recording(self) -> None:
+        """
+        Stop recording the game, writing what remains of the recording.
+        """
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def get_snapshot(self) -> Dict:
+        """
+        Get the complete state of the game as plain data.
+
+        The snapshot holds the dinosaurs, obstacles, clouds, ground offset, game
+        speed, counters and random generator state, but no surface, so it is cheap
+        to take and can be pickled.
+
+        Returns:
+            dict: The snapshot, to be given to `restore_snapshot`.
+        """
+        last_obstacle = None
+        for kind, group in (("cacti", self.cacti), ("pteras", self.pteras)):
+            if self.last_obstacle in group:
+                last_obstacle = (kind, group.index(self.last_obstacle))
+        return {
+            "counter": self.counter,
+            "gamespeed": self.gamespeed,
+            "game_over": self.game_over,
+            "high_score": self.high_score,
+            "last_dead_dino": self.last_dead_dino,
+            "random_state": self.random.getstate(),
+            "course_index": (self.course_index, self.course_cloud_index),
+            "dinos": self.dinos.get_snapshot(),
+            "cacti": [
+                (cactus.rect.left, cactus.rect.top, cactus.variant, cactus.movement[0])
+                for cactus in self.cacti
+            ],
+            "pteras": [
+                (
+                    ptera.rect.left,
+                    ptera.rect.top,
+                    ptera.height_index,
+                    ptera.index,
+                    ptera.counter,
+                    ptera.movement[0],
+                )
+                for ptera in self.pteras
+            ],
+            "last_obstacle": last_obstacle,
+            "clouds": [(cloud.rect.left, cloud.rect.top) for cloud in self.clouds],
+            "ground": (
+                self.new_ground.rect.left,
+                self.new_ground.rect1.left,
+                self.new_ground.speed,
+            ),
+        }
 
-        Cactus.containers = self.cacti
-        Ptera.containers = self.pteras
-        Cloud.containers = self.clouds
+    def restore_snapshot(self, snapshot: Dict) -> None:
+        """
+        Bring the game back to the state captured by `get_snapshot`.
 
-        temp_images, temp_rect = load_sprite_sheet(
-            "numbers.png", 12, 1, 11, SPRITE_SCALE_Y, -1
+        Args:
+            snapshot (dict): A snapshot taken from this game or from another game
+                with the same number of dinosaurs.
+        """
+        self.counter = snapshot["counter"]
+        self.gamespeed = snapshot["gamespeed"]
+        self.game_over = snapshot["game_over"]
+        self.high_score = snapshot["high_score"]
+        self.last_dead_dino = snapshot["last_dead_dino"]
+        self.random.setstate(snapshot["random_state"])
+        self.course_index, self.course_cloud_index = snapshot.get(
+            "course_index", (0, 0)
         )
-        self.HI_image = pygame.Surface((22, SPRITE_SCALE_Y))
-        self.HI_rect = self.HI_image.get_rect()
-        self.HI_image.fill(BACKGROUND_COL)
-        self.HI_image.blit(temp_images[10], temp_rect)
-        temp_rect.left += temp_rect.width
-        self.HI_image.blit(temp_images[11], temp_rect)
-        self.HI_rect.top = HEIGHT * 0.1
-        self.HI_rect.left = WIDTH * 0.73
-
-        # Update the screen with the initial state
-        self.step([ACTION_FORWARD for _ in range(self.dino_count)])
+        self.dinos.restore_snapshot(snapshot["dinos"])
+
+        self.cacti.clear()
+        for left, top, variant, speed in snapshot["cacti"]:
+            cactus = Cactus(-speed, 40, 40, variant=variant)
+            cactus.rect.topleft = (left, top)
+            self.cacti.append(cactus)
+        self.pteras.clear()
+        for left, top, height_index, index, counter, speed in snapshot["pteras"]:
+            ptera = Ptera(-speed, 46, 40, height_index=height_index)
+            ptera.rect.topleft = (left, top)
+            ptera.index = index
+            ptera.counter = counter
+            ptera.mask = ptera.masks[index]
+            self.pteras.append(ptera)
+        self.last_obstacle = None
+        if snapshot["last_obstacle"] is not None:
+            kind, i = snapshot["last_obstacle"]
+            self.last_obstacle = getattr(self, kind)[i]
+
+        self.clouds[:] = [Cloud(left, top) for left, top in snapshot["clouds"]]
+
+        ground = self.new_ground
+        ground.rect.left, ground.rect1.left, ground.speed = snapshot["ground"]
+
+    def clone(self) -> "MultiDinoGame":
+        """
+        Get an independent copy of the game, sharing its loaded assets.
+
+        The copy is always headless, so it can be stepped ahead (e.g. for lookahead
+        or tree search) without touching the display.
+
+        Returns:
+            MultiDinoGame: The copy, of the same class as this game.
+        """
+        game = object.__new__(type(self))
+        game.__dict__.update(self.__dict__)
+        game.render_enabled = False
+        game.renderer = None
+        game.screen = None
+        game.profiler = None
+        game.recorder = None
+        game.observer = None
+        game.clock = FrameClock()
+        game.random = random.Random()
+        game.color_random = random.Random()
+        game.dinos = self.dinos.copy()
+        game.new_ground = Ground()
+        game.cacti = []
+        game.pteras = []
+        game.clouds = []
+        game.restore_snapshot(self.get_snapshot())
+        return game
+
+    def enable_pixel_observations(
+        self, grayscale: bool = False, downscale: int = 1, stack: int = 1
+    ) -> PixelObserver:
+        """
+        Start turning every drawn frame into a preprocessed pixel observation,
+        returned by `get_observation`.
+
+        Frames are converted into preallocated buffers, in (height, width[, 3])
+        layout, and the last `stack` of them are kept. Only the frames that are
+        drawn are observed, so with `step(actions, repeat=k)` the stack holds the
+        last frame of each of the last steps.
+
+        Args:
+            grayscale (bool, optional): Whether to convert the frames to grayscale.
+                Defaults to False.
+            downscale (int, optional): Integer factor dividing the width and the
+                height of the frames, averaging each block of pixels. Defaults
+                to 1.
+            stack (int, optional): Number of frames in an observation. Defaults
+                to 1.
+
+        Returns:
+            PixelObserver: The observer preprocessing the frames.
+
+        Raises:
+            RuntimeError: If the game was created with render=False.
+        """
+        if not self.render_enabled:
+            raise RuntimeError(
+                "Pixel observations require a game created with render=True"
+            )
+        self.observer = PixelObserver(grayscale, downscale, stack)
+        self.observer.push(self.renderer.pixels())
+        return self.observer
+
+    def disable_pixel_observations(self) -> None:
+        """
+        Stop preprocessing the drawn frames.
+        """
+        self.observer = None
+
+    def get_observation(
+        self, out: Optional[np.ndarray] = None, copy: bool = True
+    ) -> np.ndarray:
+        """
+        Get the pixel observation of the last drawn frames, as configured by
+        `enable_pixel_observations`.
+
+        Args:
+            out (np.ndarray, optional): A preallocated uint8 array to write the
+                observation into. Defaults to None.
+            copy (bool, optional): Whether to return a copy when out isn't given.
+                Defaults to True; otherwise a read-only view of the internal
+                buffer is returned, which is only valid until the next step.
+
+        Returns:
+            np.ndarray: A uint8 array of shape ([stack,] height, width[, 3]).
+        """
+        if self.observer is None:
+            raise RuntimeError("Pixel observations are not enabled")
+        return self.observer.get(out, copy)
 
     def get_image(self):
-        return pygame.surfarray.array3d(self.screen)
+        if not self.render_enabled:
+            raise RuntimeError("get_image() requires a game created with render=True")
+        return self.renderer.get_image()
 
-    def step(self, actions: List[Literal[0, 1, 2]]):
+    def step(
+        self,
+        actions: List[Literal[0, 1, 2]],
+        repeat: int = 1,
+        render: bool = True,
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
         Execute a single game step, updating the game state based on the given actions
           for each dinosaur.
         Calling this method can be understood as "advancing the game by a single frame".
 
+        With repeat > 1, the same actions are taken for that many frames (or until
+        every dinosaur is dead) and only the last frame is drawn.
+
         Args:
             actions (list): A list of actions for each dinosaur
                 (e.g., ACTION_FORWARD, ACTION_UP, ACTION_DOWN = 0, 1, 2).
+            repeat (int, optional): Number of frames to advance. Defaults to 1.
+            render (bool, optional): Whether to draw the last frame, for games
+                created with render=True. Defaults to True.
+
+        Returns:
+            tuple: The score gained by each dinosaur during the step and whether
+                each dinosaur is dead, as two (dino_count,) arrays.
         """
-        if pygame.display.get_surface() is None:
+        if self.render_enabled and not self.renderer.has_display():
             print("Couldn't load display surface")
             self.game_over = True
-            return
+            return np.zeros(self.dino_count, dtype=np.int64), self.dinos.is_dead.copy()
+
+        initial_scores = self.dinos.score.copy()
+        for frame in range(repeat):
+            self._frame(actions, render and frame == repeat - 1)
+            if self.dinos.alive_count == 0:
+                break
+        return self.dinos.score - initial_scores, self.dinos.is_dead.copy()
+
+    def _frame(self, actions: List[Literal[0, 1, 2]], render: bool) -> None:
+        """
+        Advance the game by a single frame.
+
+        Args:
+            actions (list): A list of actions for each dinosaur.
+            render (bool): Whether to draw the frame, if it is due (see
+                render_fps and render_every). The frame in which the last
+                dinosaurs die is always drawn.
+        """
+        profiler = self.profiler
+        lap = None
+        if profiler:
+            lap = profiler.start()
+            collision_pairs = self.dinos.collision_pairs
+            mask_tests = self.dinos.mask_tests
 
         # Update the player dinos based on their actions
-        for player, action in zip(self.player_dinos, actions):
-            if player.is_dead:
-                continue
-            player.is_ducking = False
-            if action == ACTION_UP:
-                if player.rect.bottom == int(0.98 * HEIGHT):
-                    player.is_jumping = True
-                    player.movement[1] = -player.jump_speed
-            elif action == ACTION_DOWN:
-                if not (player.is_jumping and player.is_dead):
-                    player.is_ducking = True
+        self.dinos.apply_actions(actions)
+        if profiler:
+            lap = profiler.lap("input", lap)
 
         # Update obstacle movement and collision detection
-        for sprite in itertools.chain(self.cacti, self.pteras):
-            sprite.movement[0] = -self.gamespeed
-            for player in self.alive_players[:]:
-                if pygame.sprite.collide_mask(player, sprite):
-                    player.is_dead = True
-                    self.alive_players.remove(player)
-                    self.last_dead_player = player
+        for obstacle in itertools.chain(self.cacti, self.pteras):
+            obstacle.movement[0] = -self.gamespeed
+            killed = self.dinos.collide(obstacle.rect, obstacle.mask)
+            if killed.size:
+                self.last_dead_dino = int(killed[-1])
+                if self.recorder:
+                    self.recorder.record_deaths(
+                        self.counter, killed.tolist(), obstacle.rect
+                    )
+        if profiler:
+            lap = profiler.lap("collisions", lap)
+            profiler.count(
+                "collision_pairs", self.dinos.collision_pairs - collision_pairs
+            )
+            profiler.count("mask_tests", self.dinos.mask_tests - mask_tests)
 
         # Manage obstacle spawning
-        obstaculos = len(self.cacti) + len(self.pteras)
-        MIN_DISTANCE = 200 * self.gamespeed
-
-        if obstaculos < 3:
-            if obstaculos == 0:
-                self.last_obstacle.empty()
-                randomvalor = random.randrange(0, 50)
-                if randomvalor > 24:
-                    self.last_obstacle.add(Cactus(self.gamespeed, 40, 40))
-                else:
-                    self.last_obstacle.add(Ptera(self.gamespeed, 46, 40))
-            else:
-                for last_obstacle in self.last_obstacle:
-                    if (
-                        last_obstacle.rect.right < WIDTH * 0.7
-                        and random.randrange(0, 50) > 24
-                        and last_obstacle.rect.left < WIDTH - MIN_DISTANCE
-                    ):
-                        self.last_obstacle.empty()
-                        self.last_obstacle.add(Cactus(self.gamespeed, 40, 40))
-                    elif (
-                        last_obstacle.rect.right < WIDTH * 0.7
-                        and random.randrange(0, 50) <= 24
-                        and last_obstacle.rect.left < WIDTH - MIN_DISTANCE
-                    ):
-                        self.last_obstacle.empty()
-                        self.last_obstacle.add(Ptera(self.gamespeed, 46, 40))
+        if self.course is None:
+            obstacle_count = len(self.cacti) + len(self.pteras)
+            if obstacle_count == 0:
+                self.last_obstacle = None
+            kind = roll_obstacle(
+                self.random,
+                obstacle_count,
+                None if self.last_obstacle is None else self.last_obstacle.rect,
+                self.gamespeed,
+            )
+            if kind is not None:
+                self._spawn_obstacle(kind, roll_variant(self.random))
+        elif self.course_index < len(self._course_obstacles):
+            frame, kind, variant = self._course_obstacles[self.course_index]
+            if frame == self.counter:
+                self._spawn_obstacle(kind, variant)
+                self.course_index += 1
+
+        if profiler:
+            lap = profiler.lap("spawning", lap)
 
         # Add clouds to the screen
-        if len(self.clouds) < 5 and random.randrange(0, 300) == 10:
-            Cloud(WIDTH, random.randrange(HEIGHT // 5, HEIGHT // 2))
+        cloud_y = None
+        if self.course is None:
+            cloud_y = roll_cloud(self.random, len(self.clouds))
+        elif self.course_cloud_index < len(self._course_clouds):
+            frame, y = self._course_clouds[self.course_cloud_index]
+            if frame == self.counter:
+                cloud_y = y
+                self.course_cloud_index += 1
+        if cloud_y is not None:
+            self.clouds.append(Cloud(WIDTH, cloud_y))
+        if profiler:
+            lap = profiler.lap("clouds", lap)
 
         # Update the positions of the game elements
-        for player in self.alive_players:
-            player.update()
-        self.cacti.update()
-        self.pteras.update()
-        self.clouds.update()
+        self.dinos.update()
+        for group in (self.cacti, self.pteras, self.clouds):
+            for sprite in group:
+                sprite.update()
+            # Remove the elements that left the screen
+            group[:] = [sprite for sprite in group if sprite.rect.right >= 0]
+        if self.last_obstacle is not None and self.last_obstacle.rect.right < 0:
+            self.last_obstacle = None
         self.new_ground.update()
-        self.scb.update(max(self.get_scores()))
-        self.highsc.update(self.high_score)
+        if profiler:
+            lap = profiler.lap("update", lap)
 
         # Redraw the game elements on the screen
-        self.screen.fill(BACKGROUND_COL)
-        self.new_ground.draw()
-        self.clouds.draw(self.screen)
-        self.scb.draw()
-        if self.high_score != 0:
-            self.highsc.draw()
-            self.screen.blit(self.HI_image, self.HI_rect)
-        self.cacti.draw(self.screen)
-        self.pteras.draw(self.screen)
-
-        for player in self.alive_players:
-            player.draw()
-        if len(self.alive_players) == 0:
-            self.last_dead_player.draw()
-
-        # Display the current game speed
-        gamespeed_text = self.font.render(
-            f"Game Speed: {self.gamespeed}", True, (0, 0, 0)
-        )
-        self.screen.blit(gamespeed_text, (10, 10))
+        if self.render_enabled and (
+            (render and self._render_due()) or self.dinos.alive_count == 0
+        ):
+            lap = self._render(lap)
 
-        # Update the screen and FPS
-        pygame.display.update()
+        # Update the FPS
         self.clock.tick(self.fps)
+        if profiler:
+            profiler.lap("clock", lap)
 
         # End the game if all dinosaurs are dead
-        if len(self.alive_players) == 0:
+        if self.dinos.alive_count == 0:
             self.game_over = True
-            max_score = max(self.get_scores())
-            if max_score > self.high_score:
-                self.high_score = max_score
+            if self.dinos.max_score > self.high_score:
+                self.high_score = self.dinos.max_score
 
         # Increase game speed every 700 frames
         if self.counter % 700 == 699 and self.gamespeed < self.max_game_speed:
@@ -212,8 +679,213 @@ class MultiDinoGame:
             self.gamespeed += 1
 
         self.counter = self.counter + 1
+        if self.recorder:
+            self.recorder.record_frame(self, actions)
+        if profiler:
+            profiler.end_frame(self.dinos.alive_count)
+
+    def _render(self, lap: Optional[float] = None) -> Optional[float]:
+        """
+        Draw the current frame and display it.
+
+        Args:
+            lap (float, optional): Start of the current profiler lap, if the game
+                is being profiled. Defaults to None.
+
+        Returns:
+            float: The start of the next profiler lap.
+        """
+        profiler = self.profiler
+        self.render_clock.tick()
+        self.renderer.update_scoreboards(self.dinos.max_score, self.high_score)
+        if profiler:
+            lap = profiler.lap("scoreboard", lap)
+        self.renderer.draw(self)
+        if profiler:
+            lap = profiler.lap("draw", lap)
+        self.renderer.display()
+        if profiler:
+            lap = profiler.lap("display", lap)
+        if self.observer:
+            self.observer.push(self.renderer.pixels())
+            if profiler:
+                lap = profiler.lap("observation", lap)
+        return lap
+
+    def fast_forward(
+        self, window: int = WIDTH // 2, max_frames: int = 1000, render: bool = True
+    ) -> int:
+        """
+        Skip the coming frames in which no decision matters, in a single step.
+
+        While every alive dinosaur is on the ground and every obstacle ahead is
+        farther than window pixels from them, running forward is all they can do.
+        This advances the game by as many of these frames as possible, exactly
+        as if every dinosaur took ACTION_FORWARD in each of them, but computing
+        the positions, animations, counters and scores of the whole span at once.
+
+        The span stops when an obstacle comes within the window, in the frame
+        that increases the game speed and in the frame that spawns an obstacle.
+        With a pre-generated course (see `use_course`) the span is computed
+        entirely in closed form; otherwise the game's random generator is still
+        drawn once per skipped frame, so seeded games play exactly the same
+        episodes whether they fast-forward or not.
+
+        Nothing is skipped while a dinosaur is jumping, after the game is over or
+        while it is being recorded, since recordings hold every frame.
+
+        Args:
+            window (int, optional): Distance in pixels, in front of the dinosaurs,
+                under which an obstacle needs their attention. Defaults to half
+                the width of the screen.
+            max_frames (int, optional): Maximum number of frames skipped.
+                Defaults to 1000.
+            render (bool, optional): Whether to draw the last skipped frame, for
+                games created with render=True. Defaults to True.
+
+        Returns:
+            int: The number of frames skipped, 0 if a decision is needed now.
+
+        Raises:
+            ValueError: If window is negative.
+        """
+        if window < 0:
+            raise ValueError(f"The window can't be negative, got {window}")
+        dinos = self.dinos
+        if (
+            self.game_over
+            or self.recorder is not None
+            or max_frames < 1
+            or dinos.is_jumping[dinos.alive].any()
+        ):
+            return 0
+        speed = self.gamespeed
+
+        # Frames until an obstacle ahead of the dinosaurs enters the window
+        column_left, column_right = dinos.column
+        frames = max_frames
+        for obstacle in itertools.chain(self.cacti, self.pteras):
+            if obstacle.rect.right > column_left:
+                distance = obstacle.rect.left - column_right - window
+                frames = min(frames, max(0, -(-distance // speed)))
+        if frames == 0:
+            return 0
+        # The span ends with the frame that speeds the game up
+        if speed < self.max_game_speed:
+            frames = min(frames, 700 - self.counter % 700)
+
+        spawn = None
+        clouds = []
+        if self.course is None:
+            frames, spawn, clouds = self._roll_span(frames)
+        else:
+            if self.course_index < len(self._course_obstacles):
+                frame, kind, variant = self._course_obstacles[self.course_index]
+                if frame < self.counter + frames:
+                    frames = frame - self.counter + 1
+                    spawn = (kind, variant)
+                    self.course_index += 1
+            while self.course_cloud_index < len(self._course_clouds):
+                frame, y = self._course_clouds[self.course_cloud_index]
+                if frame >= self.counter + frames:
+                    break
+                clouds.append((frame - self.counter, y))
+                self.course_cloud_index += 1
+
+        dinos.advance(frames)
+        for group in (self.cacti, self.pteras):
+            for obstacle in group:
+                obstacle.movement[0] = -speed
+                obstacle.advance(frames)
+            group[:] = [sprite for sprite in group if sprite.rect.right >= 0]
+        if self.last_obstacle is not None and self.last_obstacle.rect.right < 0:
+            self.last_obstacle = None
+        # An obstacle spawned in the last frame of the span, and moved once
+        if spawn is not None:
+            self._spawn_obstacle(*spawn)
+            self.last_obstacle.advance(1)
+        for cloud in self.clouds:
+            cloud.advance(frames)
+        for frame, y in clouds:
+            cloud = Cloud(WIDTH, y)
+            cloud.advance(frames - frame)
+            self.clouds.append(cloud)
+        self.clouds[:] = [cloud for cloud in self.clouds if cloud.rect.right >= 0]
+        self.new_ground.advance(frames)
+
+        # Finish the last frame of the span like `_frame` does
+        self.counter += frames - 1
+        if self.render_enabled and render and self._render_due():
+            self._render()
+        self.clock.tick(self.fps)
+        if self.counter % 700 == 699 and self.gamespeed < self.max_game_speed:
+            self.new_ground.speed -= 1
+            self.gamespeed += 1
+        self.counter = self.counter + 1
+        if self.profiler:
+            self.profiler.count("frames_fast_forwarded", frames)
+        return frames
+
+    def _roll_span(
+        self, frames: int
+    ) -> Tuple[int, Optional[Tuple[int, int]], List[Tuple[int, int]]]:
+        """
+        Draw the obstacle and cloud rolls of the coming frames, as the frames
+        themselves would, without advancing the game.
+
+        Args:
+            frames (int): Number of frames to roll at most.
 
-    def get_state(self) -> List[List[float]]:
+        Returns:
+            tuple: The number of frames rolled, which ends with the first frame
+                that spawns an obstacle, the (kind, variant) of that obstacle, if
+                any, and the (frame, y) of the clouds spawned, frame being the
+                offset of the frame in the span.
+        """
+        speed = self.gamespeed
+        rights = [
+            obstacle.rect.right for obstacle in itertools.chain(self.cacti, self.pteras)
+        ]
+        last_obstacle = None
+        if self.last_obstacle is not None:
+            last_obstacle = self.last_obstacle.rect.copy()
+        # Right edges of the clouds at the start of the span; clouds move by a
+        # pixel per frame
+        cloud_rights = [cloud.rect.right for cloud in self.clouds]
+        clouds = []
+        for frame in range(frames):
+            moved = frame * speed
+            obstacle_count = sum(right - moved >= 0 for right in rights)
+            if obstacle_count == 0:
+                last_obstacle = None
+            kind = roll_obstacle(self.random, obstacle_count, last_obstacle, speed)
+            spawn = None
+            if kind is not None:
+                spawn = (kind, roll_variant(self.random))
+            cloud_count = sum(right - frame >= 0 for right in cloud_rights)
+            cloud_y = roll_cloud(self.random, cloud_count)
+            if cloud_y is not None:
+                clouds.append((frame, cloud_y))
+                cloud_rights.append(Cloud(WIDTH, cloud_y).rect.right + frame)
+            if spawn is not None:
+                return frame + 1, spawn, clouds
+            if last_obstacle is not None:
+                last_obstacle.left -= speed
+        return frames, None, clouds
+
+    def get_alive_indices(self) -> np.ndarray:
+        """
+        Get the indices of the alive dinosaurs, in increasing order.
+
+        This maps the rows returned with alive_only=True by `get_state`,
+        `get_state_array` and `get_scores` back to the dinosaurs.
+
+        Returns:
+            np.ndarray: An (alive_count,) int array.
+        """
+        return self.dinos.alive.copy()
+
+    def get_state(self, alive_only: bool = False) -> List[List[float]]:
         """
         Get the current state of the game for each dinosaur.
 
@@ -226,66 +898,194 @@ class MultiDinoGame:
             H2: Height of the second closest obstacle.
             GS: Game speed.
 
+        Args:
+            alive_only (bool, optional): Whether to only include the alive
+                dinosaurs, in the order of `get_alive_indices`. Defaults to False.
+
         Returns:
             list: A list of state vectors, one for each dinosaur.
         """
+        centerx, centery = self.dinos.centerx, self.dinos.centery
+        if alive_only:
+            centerx, centery = centerx[self.dinos.alive], centery[self.dinos.alive]
+        return self._state_rows(centerx.tolist(), centery.tolist())
+
+    def _state_rows(self, centerx: List[int], centery: List[int]) -> List[List[float]]:
+        """
+        Build the state vectors of dinosaurs from the centers of their rects.
+        """
+        w = WIDTH
+        h = HEIGHT
 
-        def _get_state(dino_number):
-            w = self.screen.get_width()
-            h = self.screen.get_height()
-
-            def get_coords(sprites, max_obstacles):
-                coords = []
-                for sprite in sprites:
-                    X_distance_from_dino = (
-                        sprite.rect.centerx
-                        - self.player_dinos[dino_number].rect.centerx
-                    ) / w
-                    Y_distance_from_dino = (
-                        sprite.rect.centery
-                        - self.player_dinos[dino_number].rect.centery
-                    ) / h
-                    Height = sprite.rect.height / h
-                    Width = sprite.rect.width / w
-                    # Consider only obstacles that are in front of the dino
-                    if X_distance_from_dino > 0:
-                        coords.append(
-                            (X_distance_from_dino, Y_distance_from_dino, Height, Width)
-                        )
-
-                # Return at most max_obstacles, padding if necessary
-                coords = sorted(coords, key=lambda x: x[0])[:max_obstacles]
-                return coords + [(1, 0, 0, 0)] * (
-                    max_obstacles - len(coords)
-                )  # Pad with dummy values if less obstacles
-
-            # Get the closest two obstacles (cacti and pteras combined)
-            obstacles = get_coords(self.cacti, 2) + get_coords(self.pteras, 2)
-            ordered_coords = sorted(obstacles, key=lambda x: x[0])[
-                :2
-            ]  # Take the closest two obstacles
+        # The obstacle features only depend on the dino's centerx, which is
+        # shared by every dino with the same pose.
+        closest_obstacles = {}
+        states = []
+        for centerx, centery in zip(centerx, centery):
+            if centerx not in closest_obstacles:
+                closest_obstacles[centerx] = self._closest_obstacles(centerx)
 
             # Flatten the obstacle coordinates
-            state = (
-                [self.player_dinos[dino_number].rect.centery / h]
-                + [c for obstacle in ordered_coords for c in obstacle]
-                + [self.gamespeed / w]
-            )
-            return state
+            state = [centery / h]
+            for X, obstacle_y, Height, Width in closest_obstacles[centerx]:
+                Y = 0 if obstacle_y is None else (obstacle_y - centery) / h
+                state += [X, Y, Height, Width]
+            state.append(self.gamespeed / w)
+            states.append(state)
+        return states
+
+    def get_state_array(
+        self, out: Optional[np.ndarray] = None, alive_only: bool = False
+    ) -> np.ndarray:
+        """
+        Get the current state of the game for each dinosaur as a NumPy array.
+
+        The values are the same as the ones returned by `get_state`, but the
+        obstacle features are computed once per frame and the offsets of every
+        dinosaur are applied in a single broadcast.
+
+        Args:
+            out (np.ndarray, optional): A preallocated float32 array of shape
+                (dino_count, 10), or (alive_count, 10) with alive_only, to write
+                the state into. Defaults to None, in which case a new array is
+                allocated.
+            alive_only (bool, optional): Whether to only include the alive
+                dinosaurs, in the order of `get_alive_indices`. Defaults to False.
+
+        Returns:
+            np.ndarray: A (dino_count, 10) float32 array, one state per row.
+        """
+        dinos = self.dinos
+        shape = (dinos.alive_count if alive_only else self.dino_count, 10)
+        if out is None:
+            out = np.empty(shape, dtype=np.float32)
+        elif out.shape != shape or out.dtype != np.float32:
+            raise ValueError(f"out must be a float32 array of shape {shape}")
+
+        w = WIDTH
+        h = HEIGHT
+
+        centerx, centery = dinos.centerx, dinos.centery
+        if alive_only:
+            centerx, centery = centerx[dinos.alive], centery[dinos.alive]
+        if len(centerx) == 0:
+            return out
+
+        # Usually every dino shares the same pose, and thus the same obstacle
+        # features: a single row is broadcast before adding their offsets in Y
+        x = centerx[0].item()
+        if len(centerx) > 1 and not (centerx != x).any():
+            obstacles = self._closest_obstacles(x)
+            out[:] = [
+                0,
+                *itertools.chain.from_iterable(
+                    (X, 0, Height, Width) for X, _, Height, Width in obstacles
+                ),
+                self.gamespeed / w,
+            ]
+            out[:, 0] = centery / h
+            for j, (_, y, _, _) in enumerate(obstacles):
+                if y is not None:
+                    out[:, 4 * j + 2] = (y - centery) / h
+            return out
 
-        return [_get_state(dino_number) for dino_number in range(self.dino_count)]
+        if len(centerx) < _SMALL_STATE_ROWS:
+            out[:] = self._state_rows(centerx.tolist(), centery.tolist())
+            return out
 
-    def get_scores(self) -> List[int]:
+        out[:, 0] = centery / h
+        out[:, 9] = self.gamespeed / w
+        centerx, inverse = np.unique(centerx, return_inverse=True)
+
+        # Obstacle features for each distinct dino centerx
+        features = np.zeros((len(centerx), 2, 4))
+        obstacle_y = np.zeros((len(centerx), 2))
+        has_obstacle = np.zeros((len(centerx), 2), dtype=bool)
+        for i, x in enumerate(centerx.tolist()):
+            for j, (X, y, Height, Width) in enumerate(self._closest_obstacles(x)):
+                features[i, j] = (X, 0, Height, Width)
+                if y is not None:
+                    obstacle_y[i, j] = y
+                    has_obstacle[i, j] = True
+
+        out[:, 1:9] = features.reshape(len(centerx), 8)[inverse]
+        out[:, 2:10:4] = np.where(
+            has_obstacle[inverse], (obstacle_y[inverse] - centery[:, None]) / h, 0
+        )
+        return out
+
+    def _closest_obstacles(
+        self, centerx: int
+    ) -> List[Tuple[float, Optional[int], float, float]]:
+        """
+        Get the two closest obstacles in front of a dinosaur.
+
+        Args:
+            centerx (int): The x coordinate of the center of the dinosaur.
+
+        Returns:
+            list: Two (X, centery, H, W) tuples, where X is the distance in X from
+                the dinosaur and centery the y coordinate of the obstacle's center.
+                Missing obstacles are padded with (1, None, 0, 0).
+        """
+        w = WIDTH
+        h = HEIGHT
+
+        def get_coords(sprites, max_obstacles):
+            coords = []
+            for sprite in sprites:
+                X_distance_from_dino = (sprite.rect.centerx - centerx) / w
+                Height = sprite.rect.height / h
+                Width = sprite.rect.width / w
+                # Consider only obstacles that are in front of the dino
+                if X_distance_from_dino > 0:
+                    coords.append(
+                        (X_distance_from_dino, sprite.rect.centery, Height, Width)
+                    )
+
+            # Return at most max_obstacles, padding if necessary
+            coords = sorted(coords, key=lambda x: x[0])[:max_obstacles]
+            return coords + [(1, None, 0, 0)] * (
+                max_obstacles - len(coords)
+            )  # Pad with dummy values if less obstacles
+
+        # Get the closest two obstacles (cacti and pteras combined)
+        obstacles = get_coords(self.cacti, 2) + get_coords(self.pteras, 2)
+        return sorted(obstacles, key=lambda x: x[0])[
+            :2
+        ]  # Take the closest two obstacles
+
+    def get_scores(self, alive_only: bool = False) -> List[int]:
         """
         Get the scores of all player dinosaurs.
 
+        Args:
+            alive_only (bool, optional): Whether to only include the alive
+                dinosaurs, in the order of `get_alive_indices`. Defaults to False.
+
         Returns:
             list: A list of scores for each dinosaur.
         """
-        return [player.score for player in self.player_dinos]
+        if alive_only:
+            return self.dinos.score[self.dinos.alive].tolist()
+        return self.dinos.score.tolist()
+
+    def get_max_score(self) -> int:
+        """
+        Get the highest score of the dinosaurs in the current game.
+
+        The score is kept up to date as the dinosaurs score, so this doesn't go
+        through every dinosaur.
+        """
+        return self.dinos.max_score
 
     def close(self) -> None:
         """
         Safely close the game, stopping the Pygame engine.
+
+        Headless games never started the engine, so closing them leaves any other
+        game running in the same process untouched.
         """
-        pygame.quit()
+        self.stop_recording()
+        if self.render_enabled:
+            self.renderer.close()
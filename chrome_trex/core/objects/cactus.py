@@ -1,26 +1,36 @@
 import random
 
-import pygame
-from chrome_trex.constants import HEIGHT, WIDTH
-from chrome_trex.helpers import load_sprite_sheet
+from chrome_trex.constants import GROUND_LEVEL, WIDTH
+from chrome_trex.core.rect import Rect
+from chrome_trex.helpers import get_sprite_sheet
+from chrome_trex.hitboxes import get_hitboxes
 
 
-class Cactus(pygame.sprite.Sprite):
-    def __init__(self, speed=5, sizex=-1, sizey=-1):
-        pygame.sprite.Sprite.__init__(self, self.containers)
-        self.images, self.rect = load_sprite_sheet(
-            "cacti-small.png", 3, 1, sizex, sizey, -1
-        )
-        self.rect.bottom = int(0.98 * HEIGHT)
+class Cactus:
+    def __init__(self, speed=5, sizex=-1, sizey=-1, rng=random, variant=None):
+        self.sheet = ("cacti-small.png", 3, 1, sizex, sizey)
+        size, self.masks = get_hitboxes(*self.sheet)
+        self.rect = Rect(0, 0, *size)
+        self.rect.bottom = GROUND_LEVEL
         self.rect.left = WIDTH + self.rect.width
-        self.image = self.images[random.randrange(0, 3)]
+        if variant is None:
+            variant = rng.randrange(0, 3)
+        self.variant = variant
+        self.mask = self.masks[variant]
         self.movement = [-1 * speed, 0]
 
-    def draw(self):
-        pygame.display.get_surface().blit(self.image, self.rect)
+    @property
+    def image(self):
+        return get_sprite_sheet(*self.sheet, -1).images[self.variant]
+
+    def draw(self, surface):
+        surface.blit(self.image, self.rect.topleft)
 
     def update(self):
-        self.rect = self.rect.move(self.movement)
+        self.rect.move_ip(self.movement)
 
-        if self.rect.right < 0:
-            self.kill()
+    def advance(self, frames: int) -> None:
+        """
+        Move by as much as frames calls to update would.
+        """
+        self.rect.move_ip(self.movement[0] * frames, self.movement[1] * frames)
@@ -1,20 +1,27 @@
-import pygame
-from chrome_trex.helpers import load_image
+from chrome_trex.core.rect import Rect
+from chrome_trex.helpers import get_sprite_sheet
+from chrome_trex.hitboxes import get_hitboxes
 
 
-class Cloud(pygame.sprite.Sprite):
+class Cloud:
     def __init__(self, x, y):
-        pygame.sprite.Sprite.__init__(self, self.containers)
-        self.image, self.rect = load_image("cloud.png", int(90 * 30 / 42), 30, -1)
+        self.size = (int(90 * 30 / 42), 30)
+        self.rect = Rect(x, y, *get_hitboxes("cloud.png", 1, 1, *self.size).size)
         self.speed = 1
-        self.rect.left = x
-        self.rect.top = y
         self.movement = [-1 * self.speed, 0]
 
-    def draw(self):
-        pygame.display.get_surface().blit(self.image, self.rect)
+    @property
+    def image(self):
+        return get_sprite_sheet("cloud.png", 1, 1, *self.size, -1).images[0]
+
+    def draw(self, surface):
+        surface.blit(self.image, self.rect.topleft)
 
     def update(self):
-        self.rect = self.rect.move(self.movement)
-        if self.rect.right < 0:
-            self.kill()
+        self.rect.move_ip(self.movement)
+
+    def advance(self, frames: int) -> None:
+        """
+        Move by as much as frames calls to update would.
+        """
+        self.rect.move_ip(self.movement[0] * frames, self.movement[1] * frames)
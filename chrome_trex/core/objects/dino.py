@@ -1,24 +1,27 @@
-import random
 from typing import Optional, Tuple
 
-import pygame
 from chrome_trex.constants import HEIGHT, WIDTH
-from chrome_trex.helpers import load_sprite_sheet
+from chrome_trex.helpers import get_sprite_sheet, get_tinted_sprite_sheet, random_color
 
 
 class Dino:
     def __init__(
         self, sizex=-1, sizey=-1, color: Optional[Tuple[int, int, int]] = None
     ):
-        self.running_dino_images, self.rect = load_sprite_sheet(
+        self.sizex = sizex
+        self.sizey = sizey
+        self.running_dino_images, self.rect, self.running_dino_masks = get_sprite_sheet(
             "dino.png", 5, 1, sizex, sizey, -1
         )
-        self.ducking_dino_images, self.rect1 = load_sprite_sheet(
-            "dino_ducking.png", 2, 1, 59, sizey, -1
-        )
+        (
+            self.ducking_dino_images,
+            self.rect1,
+            self.ducking_dino_masks,
+        ) = get_sprite_sheet("dino_ducking.png", 2, 1, 59, sizey, -1)
         self.rect.bottom = int(0.98 * HEIGHT)
         self.rect.left = WIDTH / 15
         self.image = self.running_dino_images[0]
+        self.mask = self.running_dino_masks[0]
         self.index = 0
         self.counter = 0
         self.score: int = 0
@@ -36,6 +39,8 @@ class Dino:
         self.colorize(color)
 
     def draw(self):
+        import pygame
+
         pygame.display.get_surface().blit(self.image, self.rect)
 
     def checkbounds(self):
@@ -69,9 +74,11 @@ class Dino:
 
         if not self.is_ducking:
             self.image = self.running_dino_images[self.index]
+            self.mask = self.running_dino_masks[self.index]
             self.rect.width = self.stand_pos_width
         else:
             self.image = self.ducking_dino_images[(self.index) % 2]
+            self.mask = self.ducking_dino_masks[(self.index) % 2]
             self.rect.width = self.duck_pos_width
 
         self.rect = self.rect.move(self.movement)
@@ -83,31 +90,13 @@ class Dino:
         self.counter = self.counter + 1
 
     def colorize(self, color: Optional[Tuple[int, int, int]] = None):
-        def _apply_color(image, color):
-            color_surface = pygame.Surface(image.get_size(), pygame.SRCALPHA)
-            color_surface.fill((color))
-            colored_image = pygame.Surface(image.get_size(), pygame.SRCALPHA)
-            colored_image.blit(image, (0, 0))
-            colored_image.blit(
-                color_surface, (0, 0), special_flags=pygame.BLENDMODE_BLEND
-            )
-            return colored_image
-
-        def _generate_random_color() -> Tuple:
-            color = [
-                random.randint(0, 150),
-                random.randint(50, 230),
-                random.randint(50, 230),
-            ]
-            random.shuffle(color)
-            return tuple(color)
-
         if not color:
-            color = _generate_random_color()
-
-        self.running_dino_images = [
-            _apply_color(img, color) for img in self.running_dino_images
-        ]
-        self.ducking_dino_images = [
-            _apply_color(img, color) for img in self.ducking_dino_images
-        ]
+            color = random_color()
+
+        # The tinted images are shared by every dinosaur of the same color
+        self.running_dino_images = list(
+            get_tinted_sprite_sheet("dino.png", 5, 1, self.sizex, self.sizey, -1, color)
+        )
+        self.ducking_dino_images = list(
+            get_tinted_sprite_sheet("dino_ducking.png", 2, 1, 59, self.sizey, -1, color)
+        )
@@ -1,20 +1,30 @@
-import pygame
 from chrome_trex.constants import HEIGHT
-from chrome_trex.helpers import load_image
+from chrome_trex.core.rect import Rect
+from chrome_trex.helpers import get_sprite_sheet
+from chrome_trex.hitboxes import get_hitboxes
 
 
 class Ground:
     def __init__(self, speed=-5):
-        self.image, self.rect = load_image("ground.png", -1, -1, -1)
-        self.image1, self.rect1 = load_image("ground.png", -1, -1, -1)
+        size = get_hitboxes("ground.png", 1, 1).size
+        self.rect = Rect(0, 0, *size)
+        self.rect1 = Rect(0, 0, *size)
+        self.reset(speed)
+
+    def reset(self, speed=-5):
         self.rect.bottom = HEIGHT
         self.rect1.bottom = HEIGHT
+        self.rect.left = 0
         self.rect1.left = self.rect.right
         self.speed = speed
 
-    def draw(self):
-        pygame.display.get_surface().blit(self.image, self.rect)
-        pygame.display.get_surface().blit(self.image1, self.rect1)
+    @property
+    def image(self):
+        return get_sprite_sheet("ground.png", 1, 1, -1, -1, -1).images[0]
+
+    def draw(self, surface):
+        surface.blit(self.image, self.rect.topleft)
+        surface.blit(self.image, self.rect1.topleft)
 
     def update(self):
         self.rect.left += self.speed
@@ -25,3 +35,23 @@ class Ground:
 
         if self.rect1.right < 0:
             self.rect1.left = self.rect.right
+
+    def advance(self, frames: int) -> None:
+        """
+        Scroll as frames calls to update would, in closed form.
+
+        The two halves are always side by side; the leftmost one jumps behind the
+        other once it has scrolled out of the screen, which happens once every
+        `width` pixels.
+        """
+        leader, follower = self.rect, self.rect1
+        if follower.left < leader.left:
+            leader, follower = follower, leader
+        width = leader.width
+        left = leader.left + self.speed * frames
+        jumps = max(0, (-left - 1) // width)
+        left += jumps * width
+        if jumps % 2:
+            leader, follower = follower, leader
+        leader.left = left
+        follower.left = left + width
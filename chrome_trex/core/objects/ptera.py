@@ -1,30 +1,47 @@
 import random
 
-import pygame
 from chrome_trex.constants import HEIGHT, WIDTH
-from chrome_trex.helpers import load_sprite_sheet
+from chrome_trex.core.rect import Rect
+from chrome_trex.helpers import get_sprite_sheet
+from chrome_trex.hitboxes import get_hitboxes
 
 
-class Ptera(pygame.sprite.Sprite):
-    def __init__(self, speed=5, sizex=-1, sizey=-1):
-        pygame.sprite.Sprite.__init__(self, self.containers)
-        self.images, self.rect = load_sprite_sheet("ptera.png", 2, 1, sizex, sizey, -1)
+class Ptera:
+    def __init__(self, speed=5, sizex=-1, sizey=-1, rng=random, height_index=None):
+        self.sheet = ("ptera.png", 2, 1, sizex, sizey)
+        size, self.masks = get_hitboxes(*self.sheet)
+        self.rect = Rect(0, 0, *size)
         self.ptera_height = [HEIGHT * 0.82, HEIGHT * 0.75, HEIGHT * 0.60]
-        self.rect.centery = self.ptera_height[random.randrange(0, 3)]
+        if height_index is None:
+            height_index = rng.randrange(0, 3)
+        self.height_index = height_index
+        self.rect.centery = self.ptera_height[height_index]
         self.rect.left = WIDTH + self.rect.width
-        self.image = self.images[0]
+        self.mask = self.masks[0]
         self.movement = [-1 * speed, 0]
         self.index = 0
         self.counter = 0
 
-    def draw(self):
-        pygame.display.get_surface().blit(self.image, self.rect)
+    @property
+    def image(self):
+        return get_sprite_sheet(*self.sheet, -1).images[self.index]
+
+    def draw(self, surface):
+        surface.blit(self.image, self.rect.topleft)
 
     def update(self):
         if self.counter % 10 == 0:
             self.index = (self.index + 1) % 2
-        self.image = self.images[self.index]
-        self.rect = self.rect.move(self.movement)
+        self.mask = self.masks[self.index]
+        self.rect.move_ip(self.movement)
         self.counter = self.counter + 1
-        if self.rect.right < 0:
-            self.kill()
+
+    def advance(self, frames: int) -> None:
+        """
+        Move and flap as frames calls to update would, in closed form.
+        """
+        flaps = (self.counter + frames - 1) // 10 - (self.counter - 1) // 10
+        self.index = (self.index + flaps) % 2
+        self.mask = self.masks[self.index]
+        self.rect.move_ip(self.movement[0] * frames, self.movement[1] * frames)
+        self.counter = self.counter + frames
@@ -1,12 +1,13 @@
-import pygame
 from chrome_trex.constants import BACKGROUND_COL, HEIGHT, SPRITE_SCALE_Y, WIDTH
-from chrome_trex.helpers import extract_digits, load_sprite_sheet
+from chrome_trex.helpers import extract_digits, get_sprite_sheet
 
 
 class Scoreboard:
     def __init__(self, x=-1, y=-1):
-        self.score = 0
-        self.tempimages, self.temprect = load_sprite_sheet(
+        import pygame
+
+        self.score = None
+        self.tempimages, self.temprect, _ = get_sprite_sheet(
             "numbers.png", 12, 1, 11, SPRITE_SCALE_Y, -1
         )
         self.image = pygame.Surface((55, SPRITE_SCALE_Y))
@@ -19,14 +20,27 @@ class Scoreboard:
             self.rect.top = HEIGHT * 0.1
         else:
             self.rect.top = y
+        self.update(0)
 
     def draw(self):
+        import pygame
+
         pygame.display.get_surface().blit(self.image, self.rect)
 
     def update(self, score):
+        """
+        Redraw the digits of the score, unless it is the score already shown.
+
+        Returns:
+            bool: Whether the image of the scoreboard changed.
+        """
+        if score == self.score:
+            return False
+        self.score = score
         score_digits = extract_digits(score)
         self.image.fill(BACKGROUND_COL)
         for s in score_digits:
             self.image.blit(self.tempimages[s], self.temprect)
             self.temprect.left += self.temprect.width
         self.temprect.left = 0
+        return True
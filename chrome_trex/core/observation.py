@@ -0,0 +1,144 @@
+from typing import Optional
+
+import numpy as np
+from chrome_trex.constants import HEIGHT, WIDTH
+
+# Integer weights of the ITU-R BT.601 luma, summing to 256
+LUMA_WEIGHTS = (77, 150, 29)
+
+
+class PixelObserver:
+    """
+    Turns the frames drawn by a game into preprocessed pixel observations.
+
+    Each frame is written into preallocated buffers in (height, width[, 3])
+    layout, optionally converted to grayscale and downscaled by an integer factor
+    (averaging each block of pixels). The last `stack` frames are kept in a ring
+    buffer laid out twice in a row, so that they can always be read, oldest first,
+    as a single contiguous view.
+    """
+
+    def __init__(self, grayscale: bool = False, downscale: int = 1, stack: int = 1):
+        """
+        Allocate the buffers of the observations.
+
+        Args:
+            grayscale (bool, optional): Whether to convert the frames to grayscale.
+                Defaults to False.
+            downscale (int, optional): Factor dividing the width and the height of
+                the frames; it must divide both. Defaults to 1.
+            stack (int, optional): Number of frames in an observation. Defaults
+                to 1, in which case observations have no leading stack dimension.
+        """
+        if downscale < 1 or HEIGHT % downscale or WIDTH % downscale:
+            raise ValueError(
+                f"downscale must divide both the width ({WIDTH}) and the height "
+                f"({HEIGHT}) of the screen"
+            )
+        if stack < 1:
+            raise ValueError("stack must be at least 1")
+        self.grayscale = grayscale
+        self.downscale = downscale
+        self.stack = stack
+
+        height, width = HEIGHT // downscale, WIDTH // downscale
+        self.frame_shape = (height, width) if grayscale else (height, width, 3)
+        self.shape = self.frame_shape if stack == 1 else (stack, *self.frame_shape)
+        self._frames = np.zeros((2 * stack, *self.frame_shape), dtype=np.uint8)
+        self._position = 0
+
+        if grayscale:
+            self._luma = np.empty((HEIGHT, WIDTH), dtype=np.uint16)
+            self._channel = np.empty((HEIGHT, WIDTH), dtype=np.uint16)
+        if downscale > 1:
+            self._sums = np.empty(self.frame_shape, dtype=np.uint32)
+
+    def reset(self) -> None:
+        """
+        Clear the frame stack.
+        """
+        self._frames[:] = 0
+        self._position = 0
+
+    def push(self, pixels: np.ndarray) -> None:
+        """
+        Preprocess a frame and add it to the stack, dropping the oldest one.
+
+        Args:
+            pixels (np.ndarray): A (HEIGHT, WIDTH, 3) uint8 RGB array, with any
+                strides (e.g. a view of the screen).
+        """
+        frame = self._frames[self._position]
+        image = pixels
+        divisor = 1
+        if self.grayscale:
+            np.multiply(pixels[..., 0], np.uint16(LUMA_WEIGHTS[0]), out=self._luma)
+            for channel in (1, 2):
+                np.multiply(
+                    pixels[..., channel],
+                    np.uint16(LUMA_WEIGHTS[channel]),
+                    out=self._channel,
+                )
+                np.add(self._luma, self._channel, out=self._luma)
+            image = self._luma
+            divisor = sum(LUMA_WEIGHTS)
+        if self.downscale > 1:
+            if self.grayscale:
+                self._block_sum(image, self._sums)
+            else:
+                for channel in range(3):
+                    self._block_sum(image[..., channel], self._sums[..., channel])
+            image = self._sums
+            divisor *= self.downscale**2
+        if divisor > 1:
+            np.floor_divide(image, divisor, out=frame, casting="unsafe")
+        else:
+            # Copying the channels one by one is much faster than copying whole
+            # pixels out of the 4 bytes per pixel screen
+            for channel in range(3):
+                np.copyto(frame[..., channel], image[..., channel])
+
+        self._frames[self._position + self.stack] = frame
+        self._position = (self._position + 1) % self.stack
+
+    def _block_sum(self, image: np.ndarray, sums: np.ndarray) -> None:
+        """
+        Sum each downscale x downscale block of a 2D image.
+
+        The blocks are summed by adding up strided slices of the image, which is
+        much faster than reducing a reshaped view.
+        """
+        step = self.downscale
+        np.copyto(sums, image[::step, ::step])
+        for i in range(step):
+            for j in range(step):
+                if i or j:
+                    np.add(sums, image[i::step, j::step], out=sums)
+
+    def get(self, out: Optional[np.ndarray] = None, copy: bool = True) -> np.ndarray:
+        """
+        Get the current observation: the stacked frames, oldest first.
+
+        Args:
+            out (np.ndarray, optional): A preallocated uint8 array of shape
+                `shape` to write the observation into. Defaults to None.
+            copy (bool, optional): Whether to return a copy when out isn't given.
+                Defaults to True; otherwise a read-only view of the internal
+                buffer is returned, which is only valid until the next frame.
+
+        Returns:
+            np.ndarray: The observation, of shape `shape`.
+        """
+        observation = self._frames[self._position : self._position + self.stack]
+        if self.stack == 1:
+            observation = observation[0]
+        if out is not None:
+            if out.shape != self.shape or out.dtype != np.uint8:
+                raise ValueError(f"out must be a uint8 array of shape {self.shape}")
+            np.copyto(out, observation)
+            return out
+        if copy:
+            return observation.copy()
+        observation = observation.view()
+        observation.flags.writeable = False
+        return observation
@@ -0,0 +1,358 @@
+import copy
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from chrome_trex.constants import ACTION_DOWN, ACTION_UP, GROUND_LEVEL, WIDTH
+from chrome_trex.core.rect import Rect
+from chrome_trex.helpers import get_sprite_sheet, get_tinted_sprite_sheet, random_color
+from chrome_trex.hitboxes import get_hitboxes
+
+# Arrays holding the state of a population, see `get_snapshot`
+_STATE_ARRAYS = (
+    "top",
+    "velocity",
+    "is_jumping",
+    "is_ducking",
+    "is_dead",
+    "index",
+    "pose",
+    "counter",
+    "score",
+)
+
+# Offset that keeps the y coordinate of airborne dinos positive in collision keys
+_KEY_OFFSET = 1 << 16
+
+
+class DinoPopulation:
+    """
+    A population of dinosaurs stored as a structure of arrays.
+
+    Every dinosaur behaves exactly like a `Dino`, but the state of the whole
+    population lives in contiguous NumPy arrays and is advanced with a few
+    vectorized operations per frame.
+
+    The pose of a dinosaur indexes `images` and `masks`: poses 0 to 4 are the
+    running frames and poses 5 and 6 the ducking frames. The masks come from the
+    baked hitboxes and the images are only loaded when the population is drawn, so
+    a population that is never drawn doesn't need pygame.
+
+    The indices of the alive dinosaurs are kept, in increasing order, in `alive`,
+    which is compacted as dinosaurs die. Every per-frame operation works on the
+    alive dinosaurs only, so frames get cheaper as the population dies off.
+    """
+
+    jump_speed = 11.5
+    gravity = 0.6
+
+    def __init__(
+        self,
+        count: int,
+        sizex: int = 44,
+        sizey: int = 47,
+        colors: Optional[Sequence[Tuple[int, int, int]]] = None,
+        rng=random,
+    ):
+        """
+        Initialize a population of dinosaurs standing on the ground.
+
+        Args:
+            count (int): Number of dinosaurs in the population.
+            sizex (int, optional): Width of a standing dinosaur. Defaults to 44.
+            sizey (int, optional): Height of a dinosaur. Defaults to 47.
+            colors (list, optional): The color of each dinosaur. Defaults to None,
+                in which case random colors of the palette are used.
+            rng (random.Random, optional): The random generator used to draw the
+                colors. Defaults to the global `random` module.
+        """
+        self.sheets = [
+            ("dino.png", 5, 1, sizex, sizey),
+            ("dino_ducking.png", 2, 1, 59, sizey),
+        ]
+        (stand_pos_width, height), running_masks = get_hitboxes(*self.sheets[0])
+        (duck_pos_width, _), ducking_masks = get_hitboxes(*self.sheets[1])
+        self.count = count
+        self.masks = np.concatenate([running_masks, ducking_masks])
+        self.left = int(WIDTH / 15)
+        self.height = height
+        self.stand_pos_width = stand_pos_width
+        self.duck_pos_width = duck_pos_width
+        self.ducking_pose = len(running_masks)
+
+        if colors is None:
+            colors = [random_color(rng) for _ in range(count)]
+        self.colors = colors
+
+        self.top = np.empty(count, dtype=np.int64)
+        self.velocity = np.empty(count, dtype=np.float64)
+        self.is_jumping = np.empty(count, dtype=bool)
+        self.is_ducking = np.empty(count, dtype=bool)
+        self.is_dead = np.empty(count, dtype=bool)
+        self.index = np.empty(count, dtype=np.int64)
+        self.pose = np.empty(count, dtype=np.int64)
+        self.counter = np.empty(count, dtype=np.int64)
+        self.score = np.empty(count, dtype=np.int64)
+        self.alive = np.arange(count)
+        # Highest score of the population, updated as the dinosaurs score
+        self.max_score = 0
+        # Total number of dino/obstacle pairs past the broad phase and of mask
+        # overlap tests actually run by collide()
+        self.collision_pairs = 0
+        self.mask_tests = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Bring every dinosaur back to life, standing on the ground with no score.
+        """
+        self.top[:] = GROUND_LEVEL - self.height
+        self.velocity[:] = 0
+        self.is_jumping[:] = False
+        self.is_ducking[:] = False
+        self.is_dead[:] = False
+        self.index[:] = 0
+        self.pose[:] = 0
+        self.counter[:] = 0
+        self.score[:] = 0
+        self.alive = np.arange(self.count)
+        self.max_score = 0
+
+    def get_snapshot(self) -> Dict[str, np.ndarray]:
+        """
+        Get a copy of the state arrays of the population.
+        """
+        return {name: getattr(self, name).copy() for name in _STATE_ARRAYS}
+
+    def restore_snapshot(self, snapshot: Dict[str, np.ndarray]) -> None:
+        """
+        Restore the state arrays of the population from a snapshot.
+        """
+        for name in _STATE_ARRAYS:
+            np.copyto(getattr(self, name), snapshot[name])
+        self.alive = np.flatnonzero(~self.is_dead)
+        self.max_score = int(self.score.max()) if self.count else 0
+
+    def copy(self) -> "DinoPopulation":
+        """
+        Get a copy of the population with its own state arrays, sharing the images,
+        masks and colors of this one.
+        """
+        population = copy.copy(self)
+        for name in _STATE_ARRAYS:
+            setattr(population, name, getattr(self, name).copy())
+        return population
+
+    @property
+    def alive_count(self) -> int:
+        return len(self.alive)
+
+    def _alive_index(self):
+        """
+        Index selecting the alive dinosaurs in the state arrays: a plain slice,
+        which is cheaper than fancy indexing, while no dinosaur died.
+        """
+        if len(self.alive) == self.count:
+            return slice(None)
+        return self.alive
+
+    @property
+    def width(self) -> np.ndarray:
+        return np.where(
+            self.pose >= self.ducking_pose, self.duck_pos_width, self.stand_pos_width
+        )
+
+    @property
+    def centerx(self) -> np.ndarray:
+        return self.left + self.width // 2
+
+    @property
+    def centery(self) -> np.ndarray:
+        return self.top + self.height // 2
+
+    @property
+    def column(self) -> Tuple[int, int]:
+        """
+        The x interval covered by the dinosaurs, whatever their pose.
+        """
+        return self.left, self.left + max(self.stand_pos_width, self.duck_pos_width)
+
+    def apply_actions(self, actions: Sequence[int]) -> None:
+        """
+        Make each alive dinosaur take the corresponding action.
+
+        Args:
+            actions (list): One action for each dinosaur
+                (e.g., ACTION_FORWARD, ACTION_UP, ACTION_DOWN = 0, 1, 2).
+        """
+        alive = self._alive_index()
+        actions = np.asarray(actions)[alive]
+        self.is_ducking[alive] = actions == ACTION_DOWN
+
+        jumping = (actions == ACTION_UP) & (
+            self.top[alive] + self.height == GROUND_LEVEL
+        )
+        self.is_jumping[alive] |= jumping
+        self.velocity[alive] = np.where(jumping, -self.jump_speed, self.velocity[alive])
+
+    def update(self) -> None:
+        """
+        Advance every alive dinosaur by a single frame.
+        """
+        alive = self._alive_index()
+        jumping = self.is_jumping[alive]
+        counter = self.counter[alive]
+        is_ducking = self.is_ducking[alive]
+        velocity = self.velocity[alive]
+        velocity[jumping] += self.gravity
+
+        # Animation: jumping dinos stand still, the others alternate between two
+        # frames every 5 frames.
+        index = self.index[alive]
+        animate = ~jumping & (counter % 5 == 0)
+        index[jumping] = 0
+        ducking = animate & is_ducking
+        index[ducking] = (index[ducking] + 1) % 2
+        running = animate & ~is_ducking
+        index[running] = (index[running] + 1) % 2 + 2
+        self.index[alive] = index
+        self.pose[alive] = np.where(is_ducking, self.ducking_pose + index % 2, index)
+
+        # Rects move by whole pixels, truncating the velocity
+        top = self.top[alive] + np.trunc(velocity).astype(np.int64)
+        landed = top + self.height > GROUND_LEVEL
+        top[landed] = GROUND_LEVEL - self.height
+        jumping[landed] = False
+        self.top[alive] = top
+        self.velocity[alive] = velocity
+        self.is_jumping[alive] = jumping
+
+        score = self.score[alive] + (counter % 7 == 6)
+        self.score[alive] = score
+        self.counter[alive] = counter + 1
+        if score.size:
+            self.max_score = max(self.max_score, int(score.max()))
+
+    def advance(self, frames: int) -> None:
+        """
+        Advance every alive dinosaur by frames frames in closed form, as if each
+        one took ACTION_FORWARD and called `update` in every frame.
+
+        The alive dinosaurs must all be on the ground (none of them jumping).
+        Their height and velocity don't change then: only the running animation,
+        the counters and the scores move on.
+        """
+        alive = self._alive_index()
+        first = self.counter[alive]
+        last = first + frames - 1
+        # Number of frames of the span that animate the dinos and that score
+        animations = last // 5 - (first - 1) // 5
+        points = (last - 6) // 7 - (first - 7) // 7
+
+        # Running frames alternate between poses 2 and 3 from the first animation
+        index = self.index[alive]
+        stepped = (index + 1) % 2 + 2
+        index = np.where(
+            animations == 0, index, np.where(animations % 2, stepped, 5 - stepped)
+        )
+        self.index[alive] = index
+        self.pose[alive] = index
+        self.is_ducking[alive] = False
+
+        score = self.score[alive] + points
+        self.score[alive] = score
+        self.counter[alive] = last + 1
+        if score.size:
+            self.max_score = max(self.max_score, int(score.max()))
+
+    @property
+    def colors(self) -> List[Tuple[int, int, int]]:
+        """
+        The color of each dinosaur.
+        """
+        return self._colors
+
+    @colors.setter
+    def colors(self, colors: Sequence[Tuple[int, int, int]]) -> None:
+        self._colors = [tuple(color) for color in colors]
+        self._colored_images: Optional[List[Tuple]] = None
+
+    @property
+    def images(self) -> List:
+        """
+        The image of each pose, loaded (with pygame) on first use.
+        """
+        running_images = get_sprite_sheet(*self.sheets[0], -1).images
+        ducking_images = get_sprite_sheet(*self.sheets[1], -1).images
+        return list(running_images + ducking_images)
+
+    def collide(self, rect: Rect, mask: np.ndarray) -> np.ndarray:
+        """
+        Kill the alive dinosaurs that collide with an obstacle.
+
+        Obstacles outside of the dinosaurs' column are skipped before any pixel
+        test, and dinosaurs with the same pose at the same height share a single
+        mask overlap test. The overlap tests of a frame are run together on the
+        row masks of the hitboxes.
+
+        Args:
+            rect (Rect): The rect of the obstacle.
+            mask (np.ndarray): The collision mask of the obstacle, one uint64 per
+                row (see `hitboxes.Hitboxes`).
+
+        Returns:
+            np.ndarray: The indices of the dinosaurs killed by the obstacle.
+        """
+        column_left, column_right = self.column
+        if rect.right <= column_left or rect.left >= column_right:
+            return np.empty(0, dtype=np.int64)
+        alive = self.alive
+        if not alive.size:
+            return alive
+
+        keys = self.pose[alive] * _KEY_OFFSET + (self.top[alive] + _KEY_OFFSET // 2)
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        self.collision_pairs += len(alive)
+        self.mask_tests += len(first)
+
+        # Align the obstacle's columns with the dinosaurs' ones. The broad phase
+        # keeps the offset within the 64 bits of a row.
+        offset = rect.left - self.left
+        if offset >= 0:
+            obstacle_rows = mask << np.uint64(offset)
+        else:
+            obstacle_rows = mask >> np.uint64(-offset)
+        # Row of each dinosaur's mask facing each row of the obstacle
+        rows = rect.top - self.top[alive[first], None] + np.arange(len(mask))
+        facing = (rows >= 0) & (rows < self.height)
+        dino_rows = self.masks[
+            self.pose[alive[first], None], np.clip(rows, 0, self.height - 1)
+        ]
+        collided = np.any(facing & ((dino_rows & obstacle_rows) != 0), axis=1)
+        dead = collided[inverse]
+        killed = alive[dead]
+        if killed.size:
+            self.is_dead[killed] = True
+            self.alive = alive[~dead]
+        return killed
+
+    def draw(self, surface, indices: Sequence[int]) -> None:
+        """
+        Draw the given dinosaurs on a surface.
+
+        The colored images are only fetched the first time the population is
+        drawn, so headless games never pay for them. They come from the asset
+        cache, so dinosaurs of the same color share a single set of images.
+        """
+        if self._colored_images is None:
+            sets = {}
+            for color in self._colors:
+                if color not in sets:
+                    sets[color] = get_tinted_sprite_sheet(
+                        *self.sheets[0], -1, color
+                    ) + get_tinted_sprite_sheet(*self.sheets[1], -1, color)
+            self._colored_images = [sets[color] for color in self._colors]
+        for i in indices:
+            surface.blit(
+                self._colored_images[i][self.pose[i]], (self.left, self.top[i])
+            )
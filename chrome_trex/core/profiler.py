@@ -0,0 +1,106 @@
+import time
+from typing import Callable, Dict, Optional
+
+from chrome_trex.helpers import get_asset_cache_stats
+
+
+class StepProfiler:
+    """
+    Per-phase wall-clock timers and counters for `MultiDinoGame.step`.
+
+    A game only measures anything while a profiler is attached to it (see
+    `MultiDinoGame.enable_profiling`), so a disabled profiler costs a single
+    `None` check per phase.
+    """
+
+    phases = (
+        "input",
+        "collisions",
+        "spawning",
+        "clouds",
+        "update",
+        "scoreboard",
+        "draw",
+        "display",
+        "observation",
+        "clock",
+    )
+
+    def __init__(
+        self,
+        callback: Optional[Callable[[Dict], None]] = None,
+        every: int = 1000,
+    ):
+        """
+        Initialize a profiler with every timer and counter at zero.
+
+        Args:
+            callback (callable, optional): Function called with a snapshot every
+                `every` frames. Defaults to None.
+            every (int, optional): Number of frames between two calls to the
+                callback. Defaults to 1000.
+        """
+        self.callback = callback
+        self.every = every
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Set every timer and counter back to zero.
+        """
+        self.frames = 0
+        self.timers = dict.fromkeys(self.phases, 0.0)
+        self.counters = {
+            "collision_pairs": 0,
+            "mask_tests": 0,
+            "obstacles_spawned": 0,
+            "frames_fast_forwarded": 0,
+        }
+        self.alive_dinos = 0
+        self._initial_loads = get_asset_cache_stats()["loads"]
+
+    def start(self) -> float:
+        """
+        Start timing a frame, returning the current time.
+        """
+        return time.perf_counter()
+
+    def lap(self, phase: str, start: float) -> float:
+        """
+        Add the time elapsed since start to a phase, returning the current time.
+        """
+        now = time.perf_counter()
+        self.timers[phase] += now - start
+        return now
+
+    def count(self, counter: str, value: int = 1) -> None:
+        """
+        Increase a counter.
+        """
+        self.counters[counter] += value
+
+    def end_frame(self, alive_dinos: int) -> None:
+        """
+        Finish a frame, calling the callback if it is due.
+        """
+        self.frames += 1
+        self.alive_dinos = alive_dinos
+        if self.callback is not None and self.frames % self.every == 0:
+            self.callback(self.snapshot())
+
+    def snapshot(self) -> Dict:
+        """
+        Get the current value of every timer and counter.
+
+        Returns:
+            dict: The number of frames, the total seconds spent in each phase, the
+                counters, the number of sprite sheets and images loaded (cache
+                misses) and the number of alive dinos in the last frame.
+        """
+        return {
+            "frames": self.frames,
+            "timers": dict(self.timers),
+            **self.counters,
+            "sheets_loaded": get_asset_cache_stats()["loads"] - self._initial_loads,
+            "alive_dinos": self.alive_dinos,
+        }
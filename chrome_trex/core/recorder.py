@@ -0,0 +1,399 @@
+"""
+Compact binary recordings of the episodes played by a game.
+
+A recording starts with an 8 bytes magic followed by a stream of blocks, each
+made of a (type, flags, reserved, length) header packed as "<BBHI" and of its
+payload, compressed with zlib when the COMPRESSED flag is set:
+
+- HEADER (JSON): the format version, the number of dinosaurs, the maximum game
+  speed, the colors of the dinosaurs and which fields the frames hold.
+- EPISODE (JSON): the index of an episode and the snapshot of the game at its
+  start (see `MultiDinoGame.get_snapshot`), which includes the state of the
+  random generator.
+- FRAMES: fixed-width frame records (see `frame_dtype`).
+- EVENTS: fixed-width spawn and death events (see `EVENT_DTYPE`).
+
+Frames and events are buffered in chunks of a fixed number of frames, so that
+recording uses a bounded amount of memory.
+"""
+
+import json
+import struct
+import zlib
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from chrome_trex.core.course import ObstacleCourse
+from chrome_trex.core.multi_dino_game import MultiDinoGame
+from chrome_trex.core.objects.ptera import Ptera
+
+MAGIC = b"TREXREC1"
+VERSION = 1
+BLOCK_HEADER = struct.Struct("<BBHI")
+
+# Block types
+HEADER = 0
+EPISODE = 1
+FRAMES = 2
+EVENTS = 3
+
+# Block flags
+COMPRESSED = 1
+
+# Event kinds
+EVENT_CACTUS = 0
+EVENT_PTERA = 1
+EVENT_DEATH = 2
+
+# A spawned obstacle (dino is -1, variant is the cactus variant or the ptera
+# height index) or a dinosaur killed by the obstacle at (x, y)
+EVENT_DTYPE = np.dtype(
+    [
+        ("episode", "<u4"),
+        ("frame", "<u4"),
+        ("kind", "u1"),
+        ("variant", "u1"),
+        ("dino", "<i4"),
+        ("x", "<i2"),
+        ("y", "<i2"),
+    ]
+)
+
+
+def frame_dtype(dino_count: int, scores: bool, states: bool) -> np.dtype:
+    """
+    Get the dtype of the frame records of a recording.
+
+    Each record holds the episode and frame numbers and the action of every
+    dinosaur, and optionally the score and the state (as returned by
+    `get_state_array`) of every dinosaur at the end of the frame.
+    """
+    fields = [
+        ("episode", "<u4"),
+        ("frame", "<u4"),
+        ("actions", "i1", (dino_count,)),
+    ]
+    if scores:
+        fields.append(("scores", "<u4", (dino_count,)))
+    if states:
+        fields.append(("states", "<f4", (dino_count, 10)))
+    return np.dtype(fields)
+
+
+def encode_snapshot(snapshot: Dict) -> Dict:
+    """
+    Convert a game snapshot to plain JSON data.
+    """
+    dinos = {name: array.tolist() for name, array in snapshot["dinos"].items()}
+    return {**snapshot, "dinos": dinos}
+
+
+def decode_snapshot(data: Dict) -> Dict:
+    """
+    Convert the JSON data of `encode_snapshot` back to a game snapshot.
+    """
+    version, state, gauss_next = data["random_state"]
+    dinos = {name: np.asarray(values) for name, values in data["dinos"].items()}
+    return {**data, "random_state": (version, tuple(state), gauss_next), "dinos": dinos}
+
+
+class EpisodeRecorder:
+    """
+    Streams the episodes played by a game into a recording file.
+
+    Recorders are created by `MultiDinoGame.start_recording`, which feeds them
+    every frame, spawn and death of the game until `stop_recording` is called.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dino_count: int,
+        max_game_speed: int,
+        colors: Sequence[Tuple[int, int, int]],
+        scores: bool = True,
+        states: bool = False,
+        compress: Union[bool, int] = False,
+        chunk_frames: int = 1024,
+    ):
+        """
+        Create a recording file and write its header.
+
+        Args:
+            path (str): Path of the recording file.
+            dino_count (int): Number of dinosaurs in the recorded game.
+            max_game_speed (int): Maximum game speed of the recorded game.
+            colors (list): Colors of the dinosaurs, so that replays look the same.
+            scores (bool, optional): Whether to record the scores after each frame.
+                Defaults to True.
+            states (bool, optional): Whether to record the state of every dinosaur
+                after each frame. Defaults to False.
+            compress (bool or int, optional): Whether to compress the blocks with
+                zlib, or the zlib compression level. Defaults to False.
+            chunk_frames (int, optional): Number of frames buffered before they are
+                written. Defaults to 1024.
+        """
+        self.dino_count = dino_count
+        self.scores = scores
+        self.states = states
+        if compress is True:
+            compress = zlib.Z_DEFAULT_COMPRESSION
+        self.compress = compress
+        self.dtype = frame_dtype(dino_count, scores, states)
+        self.episode = -1
+        self.frames_recorded = 0
+        self._frames = np.zeros(chunk_frames, dtype=self.dtype)
+        self._frame_count = 0
+        self._events: List[Tuple] = []
+
+        self.file = open(path, "wb")
+        self.file.write(MAGIC)
+        header = {
+            "version": VERSION,
+            "dino_count": dino_count,
+            "max_game_speed": max_game_speed,
+            "colors": [list(color) for color in colors],
+            "scores": scores,
+            "states": states,
+        }
+        self._write_block(HEADER, json.dumps(header).encode())
+
+    def _write_block(self, block_type: int, payload: bytes) -> None:
+        flags = 0
+        if self.compress is not False:
+            payload = zlib.compress(payload, self.compress)
+            flags |= COMPRESSED
+        self.file.write(BLOCK_HEADER.pack(block_type, flags, 0, len(payload)))
+        self.file.write(payload)
+
+    def start_episode(self, snapshot: Dict) -> None:
+        """
+        Start a new episode from the given game snapshot.
+        """
+        self.flush()
+        self.episode += 1
+        episode = {"episode": self.episode, "snapshot": encode_snapshot(snapshot)}
+        self._write_block(EPISODE, json.dumps(episode).encode())
+
+    def record_frame(self, game: MultiDinoGame, actions: Sequence[int]) -> None:
+        """
+        Record the frame the game just advanced.
+        """
+        record = self._frames[self._frame_count]
+        record["episode"] = self.episode
+        record["frame"] = game.counter - 1
+        record["actions"] = actions
+        if self.scores:
+            record["scores"] = game.dinos.score
+        if self.states:
+            MultiDinoGame.get_state_array(game, record["states"])
+        self._frame_count += 1
+        self.frames_recorded += 1
+        if self._frame_count == len(self._frames):
+            self.flush()
+
+    def record_spawn(self, frame: int, obstacle) -> None:
+        """
+        Record the spawn of an obstacle.
+        """
+        if isinstance(obstacle, Ptera):
+            kind, variant = EVENT_PTERA, obstacle.height_index
+        else:
+            kind, variant = EVENT_CACTUS, obstacle.variant
+        rect = obstacle.rect
+        self._events.append(
+            (self.episode, frame, kind, variant, -1, rect.left, rect.top)
+        )
+
+    def record_deaths(self, frame: int, dinos: Sequence[int], rect) -> None:
+        """
+        Record the death of dinosaurs hitting the obstacle at rect.
+        """
+        for dino in dinos:
+            self._events.append(
+                (self.episode, frame, EVENT_DEATH, 0, dino, rect.left, rect.top)
+            )
+
+    def flush(self) -> None:
+        """
+        Write the buffered events and frames to the file.
+        """
+        if self._events:
+            events = np.array(self._events, dtype=EVENT_DTYPE)
+            self._write_block(EVENTS, events.tobytes())
+            self._events = []
+        if self._frame_count:
+            self._write_block(FRAMES, self._frames[: self._frame_count].tobytes())
+            self._frame_count = 0
+        self.file.flush()
+
+    def close(self) -> None:
+        """
+        Write the buffered frames and close the file.
+        """
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+
+class RecordedEpisode(NamedTuple):
+    """
+    An episode read back from a recording.
+    """
+
+    index: int
+    snapshot: Dict
+    frames: np.ndarray
+    events: np.ndarray
+
+
+class EpisodeReplayer:
+    """
+    Reads a recording, either iterating over its records or re-simulating it.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a recording and read its header.
+
+        Args:
+            path (str): Path of the recording file.
+        """
+        self.path = path
+        blocks = self.iter_blocks()
+        block_type, self.header = next(blocks)
+        blocks.close()
+        if block_type != HEADER:
+            raise ValueError(f"{path} has no recording header")
+        self.dino_count = self.header["dino_count"]
+        self.dtype = frame_dtype(
+            self.dino_count, self.header["scores"], self.header["states"]
+        )
+
+    def iter_blocks(self) -> Iterator[Tuple[int, object]]:
+        """
+        Iterate over the blocks of the recording, one at a time.
+
+        Yields:
+            tuple: The type of the block and its content: a dict for HEADER and
+                EPISODE blocks (with a decoded snapshot), a structured array for
+                FRAMES and EVENTS blocks.
+        """
+        with open(self.path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not a recording")
+            while True:
+                block_header = file.read(BLOCK_HEADER.size)
+                if not block_header:
+                    return
+                block_type, flags, _, length = BLOCK_HEADER.unpack(block_header)
+                payload = file.read(length)
+                if flags & COMPRESSED:
+                    payload = zlib.decompress(payload)
+                if block_type == HEADER:
+                    yield block_type, json.loads(payload)
+                elif block_type == EPISODE:
+                    episode = json.loads(payload)
+                    episode["snapshot"] = decode_snapshot(episode["snapshot"])
+                    yield block_type, episode
+                elif block_type == FRAMES:
+                    yield block_type, np.frombuffer(payload, dtype=self.dtype)
+                elif block_type == EVENTS:
+                    yield block_type, np.frombuffer(payload, dtype=EVENT_DTYPE)
+
+    def __iter__(self) -> Iterator[RecordedEpisode]:
+        """
+        Iterate over the episodes of the recording, without simulating them.
+        """
+        episode = None
+        frames: List[np.ndarray] = []
+        events: List[np.ndarray] = []
+
+        def recorded_episode():
+            return RecordedEpisode(
+                episode["episode"],
+                episode["snapshot"],
+                np.concatenate(frames) if frames else np.empty(0, self.dtype),
+                np.concatenate(events) if events else np.empty(0, EVENT_DTYPE),
+            )
+
+        for block_type, content in self.iter_blocks():
+            if block_type == EPISODE:
+                if episode is not None:
+                    yield recorded_episode()
+                episode, frames, events = content, [], []
+            elif block_type == FRAMES:
+                frames.append(content)
+            elif block_type == EVENTS:
+                events.append(content)
+        if episode is not None:
+            yield recorded_episode()
+
+    def replay(
+        self,
+        render: bool = False,
+        fps: int = 0,
+        verify: bool = True,
+        course: Optional[ObstacleCourse] = None,
+    ) -> Iterator[Tuple[np.ndarray, MultiDinoGame]]:
+        """
+        Re-simulate the recording, frame by frame.
+
+        Each episode starts from its recorded snapshot and the recorded actions are
+        taken again, so the game goes through exactly the same frames.
+
+        Args:
+            render (bool, optional): Whether to draw the replay in a window.
+                Defaults to False.
+            fps (int, optional): Frames per second of the replay. Defaults to 0, in
+                which case the replay goes as fast as possible.
+            verify (bool, optional): Whether to check the recorded scores and
+                states against the replayed ones. Defaults to True.
+            course (ObstacleCourse, optional): The course played by the recorded
+                game, if it used one (see `MultiDinoGame.use_course`). Defaults to
+                None.
+
+        Yields:
+            tuple: The frame record and the game, right after replaying the frame.
+
+        Raises:
+            RuntimeError: If verify is set and the replay diverges from the
+                recording.
+        """
+        game = MultiDinoGame(
+            self.dino_count,
+            fps=fps,
+            max_game_speed=self.header["max_game_speed"],
+            render=render,
+        )
+        game.dinos.colors = [tuple(color) for color in self.header["colors"]]
+        if course is not None:
+            game.use_course(course)
+        state = np.empty((self.dino_count, 10), dtype=np.float32)
+        try:
+            for block_type, content in self.iter_blocks():
+                if block_type == EPISODE:
+                    game.restore_snapshot(content["snapshot"])
+                if block_type != FRAMES:
+                    continue
+                for record in content:
+                    MultiDinoGame.step(game, record["actions"])
+                    if verify:
+                        self._verify(game, record, state)
+                    yield record, game
+        finally:
+            game.close()
+
+    def _verify(self, game: MultiDinoGame, record: np.ndarray, state: np.ndarray):
+        if self.header["scores"]:
+            matches = np.array_equal(game.dinos.score, record["scores"])
+        else:
+            matches = True
+        if matches and self.header["states"]:
+            MultiDinoGame.get_state_array(game, state)
+            matches = np.array_equal(state, record["states"])
+        if not matches:
+            raise RuntimeError(
+                f"The replay diverged from the recording at frame {record['frame']}"
+                f" of episode {record['episode']}"
+            )
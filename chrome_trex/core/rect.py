@@ -0,0 +1,100 @@
+from typing import Tuple
+
+
+def _to_int(value) -> int:
+    """
+    Round a coordinate the way pygame.Rect does (halves away from zero).
+    """
+    if isinstance(value, int):
+        return value
+    if value >= 0:
+        return int(value + 0.5)
+    return -int(0.5 - value)
+
+
+class Rect:
+    """
+    An integer rectangle implementing the part of the pygame.Rect interface used by
+    the simulation, so that the game can run without importing pygame.
+
+    Assigned coordinates are rounded and moves are truncated, exactly like
+    pygame.Rect.
+    """
+
+    __slots__ = ("left", "top", "width", "height")
+
+    def __init__(self, left: int, top: int, width: int, height: int):
+        self.left = _to_int(left)
+        self.top = _to_int(top)
+        self.width = _to_int(width)
+        self.height = _to_int(height)
+
+    def __repr__(self) -> str:
+        return f"<rect({self.left}, {self.top}, {self.width}, {self.height})>"
+
+    def __eq__(self, other) -> bool:
+        return tuple(self) == tuple(other)
+
+    def __iter__(self):
+        return iter((self.left, self.top, self.width, self.height))
+
+    @property
+    def right(self) -> int:
+        return self.left + self.width
+
+    @right.setter
+    def right(self, value) -> None:
+        self.left = _to_int(value) - self.width
+
+    @property
+    def bottom(self) -> int:
+        return self.top + self.height
+
+    @bottom.setter
+    def bottom(self, value) -> None:
+        self.top = _to_int(value) - self.height
+
+    @property
+    def centerx(self) -> int:
+        return self.left + self.width // 2
+
+    @centerx.setter
+    def centerx(self, value) -> None:
+        self.left = _to_int(value) - self.width // 2
+
+    @property
+    def centery(self) -> int:
+        return self.top + self.height // 2
+
+    @centery.setter
+    def centery(self, value) -> None:
+        self.top = _to_int(value) - self.height // 2
+
+    @property
+    def topleft(self) -> Tuple[int, int]:
+        return self.left, self.top
+
+    @topleft.setter
+    def topleft(self, value) -> None:
+        self.left, self.top = _to_int(value[0]), _to_int(value[1])
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.width, self.height
+
+    def copy(self) -> "Rect":
+        return Rect(self.left, self.top, self.width, self.height)
+
+    def move(self, x, y=None) -> "Rect":
+        rect = self.copy()
+        rect.move_ip(x, y)
+        return rect
+
+    def move_ip(self, x, y=None) -> None:
+        """
+        Move the rect in place, truncating the offsets like pygame.Rect.move.
+        """
+        if y is None:
+            x, y = x
+        self.left += int(x)
+        self.top += int(y)
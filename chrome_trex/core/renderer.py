@@ -0,0 +1,198 @@
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+import numpy as np
+import pygame
+from chrome_trex.constants import BACKGROUND_COL, HEIGHT, SPRITE_SCALE_Y, WIDTH
+from chrome_trex.core.objects.scoreboard import Scoreboard
+from chrome_trex.helpers import get_sprite_sheet
+
+if TYPE_CHECKING:
+    from chrome_trex.core.multi_dino_game import MultiDinoGame
+
+SPEED_LABEL_POSITION = (10, 10)
+
+
+class Renderer:
+    """
+    The window of a game and everything drawn on it.
+
+    This is the only part of a game that needs pygame; it is imported and created
+    by games constructed with render=True.
+
+    Only the regions that changed since the last frame are cleared and drawn
+    again, and only those are sent to the window. The speed label and the
+    scoreboards are only rendered again when their values change.
+    """
+
+    def __init__(self):
+        """
+        Initialize pygame and open the game window.
+        """
+        pygame.init()
+        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        self.screen_rect = self.screen.get_rect()
+        pygame.display.set_caption("T-Rex Rush")
+        self.font = pygame.font.Font(None, 24)
+
+        self.scb = Scoreboard()
+        self.highsc = Scoreboard(WIDTH * 0.78)
+
+        temp_images, temp_rect, _ = get_sprite_sheet(
+            "numbers.png", 12, 1, 11, SPRITE_SCALE_Y, -1
+        )
+        self.HI_image = pygame.Surface((22, SPRITE_SCALE_Y))
+        self.HI_rect = self.HI_image.get_rect()
+        self.HI_image.fill(BACKGROUND_COL)
+        self.HI_image.blit(temp_images[10], temp_rect)
+        temp_rect.left += temp_rect.width
+        self.HI_image.blit(temp_images[11], temp_rect)
+        self.HI_rect.top = HEIGHT * 0.1
+        self.HI_rect.left = WIDTH * 0.73
+
+        self._speed_label: Optional[Tuple[int, pygame.Surface]] = None
+        self._high_score_shown = False
+        # Regions of the moving elements in the last drawn frame
+        self._moving_rects: List = []
+        # Regions of the still elements that changed since the last drawn frame,
+        # and regions to send to the window; None for the whole screen
+        self._changed: Optional[List] = None
+        self._dirty: Optional[List] = None
+
+    def has_display(self) -> bool:
+        return pygame.display.get_surface() is not None
+
+    def update_scoreboards(self, score: int, high_score: int) -> None:
+        if self.scb.update(score):
+            self._add_changed(self.scb.rect)
+        if self.highsc.update(high_score):
+            self._add_changed(self.highsc.rect)
+
+    def _add_changed(self, rect) -> None:
+        if self._changed is not None:
+            self._changed.append(tuple(rect))
+
+    def _merge_rects(self, rects) -> List[pygame.Rect]:
+        """
+        Clip rects to the screen and merge the overlapping ones, so that every
+        region is cleared and sent to the window once.
+        """
+        merged: List[pygame.Rect] = []
+        for rect in rects:
+            rect = self.screen_rect.clip(rect)
+            if rect.width == 0 or rect.height == 0:
+                continue
+            index = rect.collidelist(merged)
+            while index != -1:
+                rect.union_ip(merged.pop(index))
+                index = rect.collidelist(merged)
+            merged.append(rect)
+        return merged
+
+    def get_speed_label(self, gamespeed: int) -> pygame.Surface:
+        """
+        Get the rendered "Game Speed" label, rendering it only when the speed
+        changes.
+        """
+        if self._speed_label is None or self._speed_label[0] != gamespeed:
+            if self._speed_label is not None:
+                self._add_changed(
+                    self._speed_label[1].get_rect(topleft=SPEED_LABEL_POSITION)
+                )
+            label = self.font.render(f"Game Speed: {gamespeed}", True, (0, 0, 0))
+            self._speed_label = (gamespeed, label)
+            self._add_changed(label.get_rect(topleft=SPEED_LABEL_POSITION))
+        return self._speed_label[1]
+
+    def draw(self, game: "MultiDinoGame") -> None:
+        """
+        Redraw the game elements on the screen.
+
+        The regions of the elements that moved or changed since the last drawn
+        frame are cleared, then every element is blitted again in order. Blitting
+        an opaque or colorkeyed image over its own unchanged pixels leaves them as
+        they are, so the screen ends up exactly as if it had been cleared
+        entirely. The antialiased speed label is the exception, and is only
+        blitted again over a cleared region.
+        """
+        ground = game.new_ground
+        obstacles = game.cacti + game.pteras
+        dinos = game.dinos
+        if dinos.alive_count == 0:
+            indices = np.array([game.last_dead_dino])
+        else:
+            indices = dinos.alive
+        # Every dinosaur is drawn in the same column, so a single rect covers them
+        tops = dinos.top[indices]
+        left, right = dinos.column
+        top = int(tops.min())
+        moving_rects = [
+            tuple(ground.rect),
+            tuple(ground.rect1),
+            *(tuple(cloud.rect) for cloud in game.clouds),
+            *(tuple(obstacle.rect) for obstacle in obstacles),
+            (left, top, right - left, int(tops.max()) + dinos.height - top),
+        ]
+
+        label = self.get_speed_label(game.gamespeed)
+        high_score_shown = game.high_score != 0
+        if high_score_shown != self._high_score_shown:
+            self._high_score_shown = high_score_shown
+            self._add_changed(self.highsc.rect)
+            self._add_changed(self.HI_rect)
+
+        redraw_label = True
+        if self._changed is None:
+            self.screen.fill(BACKGROUND_COL)
+        else:
+            changed = self._merge_rects(
+                self._changed + self._moving_rects + moving_rects
+            )
+            label_rect = label.get_rect(topleft=SPEED_LABEL_POSITION)
+            redraw_label = label_rect.collidelist(changed) != -1
+            if redraw_label:
+                changed = self._merge_rects(changed + [label_rect])
+            for rect in changed:
+                self.screen.fill(BACKGROUND_COL, rect)
+            if self._dirty is not None:
+                self._dirty += changed
+        self._changed = []
+        self._moving_rects = moving_rects
+
+        ground.draw(self.screen)
+        for cloud in game.clouds:
+            cloud.draw(self.screen)
+        self.scb.draw()
+        if high_score_shown:
+            self.highsc.draw()
+            self.screen.blit(self.HI_image, self.HI_rect)
+        for obstacle in obstacles:
+            obstacle.draw(self.screen)
+        dinos.draw(self.screen, indices)
+
+        # Display the current game speed
+        if redraw_label:
+            self.screen.blit(label, SPEED_LABEL_POSITION)
+
+    def display(self) -> None:
+        """
+        Send the regions drawn since the last call to the window.
+        """
+        if self._dirty is None:
+            pygame.display.update()
+        else:
+            pygame.display.update(self._dirty)
+        self._dirty = []
+
+    def pixels(self) -> np.ndarray:
+        """
+        Get a (HEIGHT, WIDTH, 3) view of the pixels of the screen.
+
+        The screen stays locked, and can't be drawn on, until the view is released.
+        """
+        return pygame.surfarray.pixels3d(self.screen).transpose(1, 0, 2)
+
+    def get_image(self) -> np.ndarray:
+        return pygame.surfarray.array3d(self.screen)
+
+    def close(self) -> None:
+        pygame.quit()
@@ -0,0 +1,133 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from chrome_trex.core.dino_game import DinoGame
+
+
+def _env_seeds(seed: Optional[int], count: int) -> List[Optional[int]]:
+    if seed is None:
+        return [None] * count
+    return [seed + i for i in range(count)]
+
+
+class VectorDinoGame:
+    """
+    A class to run a batch of independent single-player games of T-Rex Rush.
+
+    Every game has its own world (obstacles, game speed, counters and random
+    generator) and runs headless, so any number of them can live in the same
+    process. The games are stepped together and their states are stacked.
+    """
+
+    def __init__(
+        self,
+        num_envs: int,
+        max_game_speed: int = 12,
+        auto_reset: bool = True,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize a batch of headless games.
+
+        Args:
+            num_envs (int): Number of independent games.
+            max_game_speed (int, optional): Maximum game speed. Defaults to 12.
+            auto_reset (bool, optional): Whether to reset the games that are over
+                at the end of each step. Defaults to True.
+            seed (int, optional): Seed of the first game; the i-th game is seeded
+                with seed + i. Defaults to None, in which case the games are
+                seeded from the system.
+        """
+        self.num_envs = num_envs
+        self.auto_reset = auto_reset
+        self.envs = [
+            DinoGame(fps=0, max_game_speed=max_game_speed, render=False, seed=env_seed)
+            for env_seed in _env_seeds(seed, num_envs)
+        ]
+        self.observations = np.zeros((num_envs, 10), dtype=np.float32)
+        self.scores = np.zeros(num_envs, dtype=np.int64)
+        self.final_scores = np.zeros(num_envs, dtype=np.int64)
+        for env, observation in zip(self.envs, self.observations):
+            env.get_state_array(observation)
+
+    def reset(self, seed: Optional[int] = None) -> np.ndarray:
+        """
+        Reset every game.
+
+        Args:
+            seed (int, optional): New seed of the first game; the i-th game is
+                seeded with seed + i. Defaults to None, in which case the games'
+                generators keep their current state.
+
+        Returns:
+            np.ndarray: A (num_envs, 10) float32 array with the state of each game.
+        """
+        for env, observation, env_seed in zip(
+            self.envs, self.observations, _env_seeds(seed, self.num_envs)
+        ):
+            env.reset(env_seed)
+            env.get_state_array(observation)
+        self.scores[:] = 0
+        return self.observations.copy()
+
+    def step(
+        self, actions: Sequence[int], repeat: int = 1
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Advance every game by a single frame, or by repeat frames taking the same
+        action (stopping early in the games that end).
+
+        Games that are over are reset when auto_reset is enabled, in which case the
+        returned state is the first state of their new episode and their final
+        score is kept in `final_scores`.
+
+        Args:
+            actions (list): One action for each game
+                (e.g., ACTION_FORWARD, ACTION_UP, ACTION_DOWN = 0, 1, 2).
+            repeat (int, optional): Number of frames to advance. Defaults to 1.
+
+        Returns:
+            tuple: The (num_envs, 10) float32 states, the (num_envs,) float32
+                rewards (the score gained in this step) and the (num_envs,) bool
+                flags telling which games are over.
+        """
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        dones = np.zeros(self.num_envs, dtype=bool)
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            if env.game_over:
+                dones[i] = True
+                continue
+            rewards[i], _ = env.step(action, repeat)
+            self.scores[i] += rewards[i]
+            dones[i] = env.game_over
+            if dones[i] and self.auto_reset:
+                self.final_scores[i] = self.scores[i]
+                self.scores[i] = 0
+                env.reset()
+            env.get_state_array(self.observations[i])
+        return self.observations.copy(), rewards, dones
+
+    def get_state(self) -> np.ndarray:
+        """
+        Get the current state of every game.
+
+        Returns:
+            np.ndarray: A (num_envs, 10) float32 array, one state per row.
+        """
+        return self.observations.copy()
+
+    def get_scores(self) -> List[int]:
+        """
+        Get the current score of every game.
+
+        Returns:
+            list: The score of each game.
+        """
+        return [env.get_score() for env in self.envs]
+
+    def close(self) -> None:
+        """
+        Close every game.
+        """
+        for env in self.envs:
+            env.close()
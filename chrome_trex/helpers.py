@@ -1,17 +1,67 @@
 import io
 import os
 import pkgutil
-from typing import List
+import random
+from typing import TYPE_CHECKING, Dict, Hashable, List, NamedTuple, Tuple
 
-import pygame
+from chrome_trex.atlas import AtlasEntry, get_atlas_entry
+
+# pygame is only imported by the functions that load or draw images, so that
+# headless games never import it
+if TYPE_CHECKING:
+    import pygame
+
+
+class SpriteSheet(NamedTuple):
+    """
+    Pre-sliced and pre-scaled sprite sheet handed out by the asset cache.
+    """
+
+    images: Tuple["pygame.Surface", ...]
+    rect: "pygame.Rect"
+    masks: Tuple["pygame.mask.Mask", ...]
+
+
+class ImageAsset(NamedTuple):
+    """
+    Pre-scaled image handed out by the asset cache.
+    """
+
+    image: "pygame.Surface"
+    rect: "pygame.Rect"
+    mask: "pygame.mask.Mask"
+
+
+# Process-wide cache of decoded assets, see `get_sprite_sheet` and `get_image`.
+_asset_cache: Dict[Hashable, Tuple] = {}
+_asset_cache_stats = {"hits": 0, "loads": 0}
+
+
+def _convert(surface: "pygame.Surface") -> "pygame.Surface":
+    """
+    Convert a surface to an opaque pixel format.
+
+    When no display mode has been set (headless games), the pixels are copied into
+    a plain 32 bits surface instead, which yields the same RGB values as
+    `Surface.convert()` without requiring a window.
+    """
+    import pygame
+
+    if pygame.display.get_surface() is not None:
+        return surface.convert()
+    return pygame.image.frombytes(
+        pygame.image.tobytes(surface, "RGBX"), surface.get_size(), "RGBX"
+    )
 
 
 def load_image(name, sizex=-1, sizey=-1, colorkey=None):
+    import pygame
+
     fullname = os.path.join("sprites", name)
     image = pygame.image.load(
         io.BytesIO(pkgutil.get_data("chrome_trex", fullname)), fullname
     )
-    image = image.convert()
+    image = _convert(image)
     if colorkey is not None:
         if colorkey == -1:
             colorkey = image.get_at((0, 0))
@@ -24,11 +74,13 @@ def load_image(name, sizex=-1, sizey=-1, colorkey=None):
 
 
 def load_sprite_sheet(sheetname, nx, ny, scalex=-1, scaley=-1, colorkey=None):
+    import pygame
+
     fullname = os.path.join("sprites", sheetname)
     sheet = pygame.image.load(
         io.BytesIO(pkgutil.get_data("chrome_trex", fullname)), fullname
     )
-    sheet = sheet.convert()
+    sheet = _convert(sheet)
 
     sheet_rect = sheet.get_rect()
 
@@ -41,7 +93,8 @@ def load_sprite_sheet(sheetname, nx, ny, scalex=-1, scaley=-1, colorkey=None):
         for j in range(0, nx):
             rect = pygame.Rect((j * sizex, i * sizey, sizex, sizey))
             image = pygame.Surface(rect.size)
-            image = image.convert()
+            if pygame.display.get_surface() is not None:
+                image = image.convert()
             image.blit(sheet, (0, 0), rect)
 
             if colorkey is not None:
@@ -59,5 +112,212 @@ def load_sprite_sheet(sheetname, nx, ny, scalex=-1, scaley=-1, colorkey=None):
     return sprites, sprite_rect
 
 
+def _atlas_sprite_sheet(entry: AtlasEntry):
+    """
+    Build the images of a sprite sheet baked into the atlas.
+
+    The pixels are copied out of the memory mapped atlas, which is read-only,
+    converted to the display's pixel format when there is one.
+    """
+    import pygame
+
+    width, height = entry.size
+    images = []
+    for pixels in entry.pixels:
+        image = pygame.image.frombuffer(pixels, (width, height), "RGBX")
+        if pygame.display.get_surface() is not None:
+            image = image.convert()
+        else:
+            image = image.copy()
+        if entry.colorkey is not None:
+            image.set_colorkey(entry.colorkey, pygame.RLEACCEL)
+        images.append(image)
+    return images, pygame.Rect(0, 0, width, height)
+
+
+def get_sprite_sheet(
+    sheetname, nx, ny, scalex=-1, scaley=-1, colorkey=None
+) -> SpriteSheet:
+    """
+    Get a sprite sheet from the process-wide asset cache, loading it on first use.
+
+    The arguments are the same as `load_sprite_sheet`. Sheets baked into the
+    sprite atlas are built from it instead of decoding their image. The returned
+    surfaces and masks are shared by every caller and must not be modified; the
+    rect is a fresh copy that can be moved freely.
+
+    Returns:
+        SpriteSheet: The sliced images, the rect of a single image and the
+            collision mask of each image.
+    """
+    import pygame
+
+    key = (
+        "sheet",
+        sheetname,
+        nx,
+        ny,
+        scalex,
+        scaley,
+        colorkey,
+        pygame.display.get_surface() is not None,
+    )
+    sheet = _asset_cache.get(key)
+    if sheet is None:
+        _asset_cache_stats["loads"] += 1
+        entry = None
+        if colorkey == -1:
+            entry = get_atlas_entry(sheetname, nx, ny, scalex, scaley)
+        if entry is not None:
+            images, rect = _atlas_sprite_sheet(entry)
+        else:
+            images, rect = load_sprite_sheet(
+                sheetname, nx, ny, scalex, scaley, colorkey
+            )
+        sheet = SpriteSheet(
+            tuple(images),
+            rect,
+            tuple(pygame.mask.from_surface(image) for image in images),
+        )
+        _asset_cache[key] = sheet
+    else:
+        _asset_cache_stats["hits"] += 1
+    return SpriteSheet(sheet.images, sheet.rect.copy(), sheet.masks)
+
+
+def get_image(name, sizex=-1, sizey=-1, colorkey=None) -> ImageAsset:
+    """
+    Get an image from the process-wide asset cache, loading it on first use.
+
+    The arguments are the same as `load_image`. The returned surface and mask are
+    shared by every caller and must not be modified; the rect is a fresh copy
+    that can be moved freely.
+
+    Returns:
+        ImageAsset: The image, its rect and its collision mask.
+    """
+    import pygame
+
+    key = (
+        "image",
+        name,
+        sizex,
+        sizey,
+        colorkey,
+        pygame.display.get_surface() is not None,
+    )
+    asset = _asset_cache.get(key)
+    if asset is None:
+        _asset_cache_stats["loads"] += 1
+        image, rect = load_image(name, sizex, sizey, colorkey)
+        asset = ImageAsset(image, rect, pygame.mask.from_surface(image))
+        _asset_cache[key] = asset
+    else:
+        _asset_cache_stats["hits"] += 1
+    return ImageAsset(asset.image, asset.rect.copy(), asset.mask)
+
+
+def get_tinted_sprite_sheet(
+    sheetname, nx, ny, scalex=-1, scaley=-1, colorkey=None, color=(0, 0, 0)
+) -> Tuple["pygame.Surface", ...]:
+    """
+    Get the images of a sprite sheet blended with a color, from the process-wide
+    asset cache.
+
+    The arguments are the same as `get_sprite_sheet`, along with the color (see
+    `colorize_image`). The tinted images are created once per color and shared by
+    every caller, so they must not be modified.
+
+    Returns:
+        tuple: The tinted images.
+    """
+    import pygame
+
+    color = tuple(color)
+    key = (
+        "tinted",
+        sheetname,
+        nx,
+        ny,
+        scalex,
+        scaley,
+        colorkey,
+        color,
+        pygame.display.get_surface() is not None,
+    )
+    images = _asset_cache.get(key)
+    if images is None:
+        sheet = get_sprite_sheet(sheetname, nx, ny, scalex, scaley, colorkey)
+        _asset_cache_stats["loads"] += 1
+        images = tuple(colorize_image(image, color) for image in sheet.images)
+        _asset_cache[key] = images
+    else:
+        _asset_cache_stats["hits"] += 1
+    return images
+
+
+def clear_asset_cache() -> None:
+    """
+    Drop every cached asset, so they are loaded again on their next use.
+    """
+    _asset_cache.clear()
+
+
+def get_asset_cache_stats() -> Dict[str, int]:
+    """
+    Get the number of asset cache hits and of assets loaded since the start of the
+    process.
+    """
+    return dict(_asset_cache_stats)
+
+
+def _palette_color(rng: random.Random) -> Tuple[int, int, int]:
+    """
+    Draw one color of the dinosaur palette.
+    """
+    color = [
+        rng.randint(0, 150),
+        rng.randint(50, 230),
+        rng.randint(50, 230),
+    ]
+    rng.shuffle(color)
+    return tuple(color)
+
+
+# The colors given to dinosaurs. Drawing from a bounded palette lets every
+# dinosaur of a color share the same tinted sprites, however large the
+# population (see `get_tinted_sprite_sheet`).
+_palette_random = random.Random(0)
+DINO_PALETTE: Tuple[Tuple[int, int, int], ...] = tuple(
+    _palette_color(_palette_random) for _ in range(32)
+)
+del _palette_random
+
+
+def random_color(rng=random) -> Tuple[int, int, int]:
+    """
+    Pick a random color of the palette for a dinosaur.
+
+    Args:
+        rng (random.Random, optional): The random generator to draw the color from.
+            Defaults to the global `random` module.
+    """
+    return DINO_PALETTE[rng.randrange(len(DINO_PALETTE))]
+
+
+def colorize_image(image: "pygame.Surface", color) -> "pygame.Surface":
+    """
+    Get a copy of an image blended with the given color.
+    """
+    import pygame
+
+    color_surface = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+    color_surface.fill((color))
+    colored_image = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+    colored_image.blit(image, (0, 0))
+    colored_image.blit(color_surface, (0, 0), special_flags=pygame.BLENDMODE_BLEND)
+    return colored_image
+
+
 def extract_digits(number: int) -> List[int]:
     return list(map(int, list(str(number).zfill(5))))
@@ -0,0 +1,86 @@
+"""
+Sizes and collision masks of the sprites, usable without pygame.
+
+The hitboxes of every sprite sheet used by the game are read from the prebaked
+sprite atlas (see `chrome_trex.atlas`), so that headless games never decode an
+image nor import pygame.
+"""
+
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+from chrome_trex.atlas import get_atlas_entry
+
+# Masks are stored with one unsigned 64 bits integer per row
+MAX_MASK_WIDTH = 64
+
+
+class Hitboxes(NamedTuple):
+    """
+    Size of the frames of a sprite sheet and collision mask of each frame.
+
+    Each mask is stored as one integer per row, bit x of a row being set when the
+    pixel at column x is solid, so `masks` is a (frames, height) uint64 array. It
+    is None for sprites wider than 64 pixels, which never collide.
+    """
+
+    size: Tuple[int, int]
+    masks: Optional[np.ndarray]
+
+
+_hitboxes_cache: Dict[Tuple, Hitboxes] = {}
+
+
+def mask_rows(mask) -> np.ndarray:
+    """
+    Pack a pygame mask at most 64 pixels wide into one uint64 per row.
+    """
+    width, height = mask.get_size()
+    rows = np.zeros(height, dtype=np.uint64)
+    for y in range(height):
+        row = 0
+        for x in range(width):
+            if mask.get_at((x, y)):
+                row |= 1 << x
+        rows[y] = row
+    return rows
+
+
+def bake_hitboxes(sheetname, nx, ny, scalex=-1, scaley=-1) -> Hitboxes:
+    """
+    Compute the hitboxes of a sprite sheet from its image, which requires pygame.
+
+    The arguments are the same as `helpers.get_sprite_sheet`, with a colorkey of -1.
+
+    Returns:
+        Hitboxes: The size of the frames and their collision masks.
+    """
+    from chrome_trex.helpers import get_sprite_sheet
+
+    _, rect, masks = get_sprite_sheet(sheetname, nx, ny, scalex, scaley, -1)
+    if rect.width > MAX_MASK_WIDTH:
+        return Hitboxes(rect.size, None)
+    return Hitboxes(rect.size, np.stack([mask_rows(mask) for mask in masks]))
+
+
+def get_hitboxes(sheetname, nx, ny, scalex=-1, scaley=-1) -> Hitboxes:
+    """
+    Get the hitboxes of a sprite sheet.
+
+    The arguments are the same as `helpers.get_sprite_sheet`. Baked sheets are read
+    from the sprite atlas; any other sheet is computed from its image with pygame
+    on first use. The returned masks are shared and must not be modified.
+
+    Returns:
+        Hitboxes: The size of the frames and their collision masks.
+    """
+    sheet = (sheetname, nx, ny, scalex, scaley)
+    hitboxes = _hitboxes_cache.get(sheet)
+    if hitboxes is None:
+        entry = get_atlas_entry(*sheet)
+        if entry is not None:
+            hitboxes = Hitboxes(entry.size, entry.masks)
+        else:
+            hitboxes = bake_hitboxes(*sheet)
+        _hitboxes_cache[sheet] = hitboxes
+    return hitboxes
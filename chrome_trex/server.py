@@ -0,0 +1,466 @@
+"""
+Local socket server hosting many headless games, for agents living in other
+processes. Start it with `python -m chrome_trex.server`.
+
+The server runs on asyncio and listens on a Unix socket or on a TCP port. Each
+connection opens any number of sessions, each one being a headless
+`MultiDinoGame` (a session with a single dinosaur plays like a `DinoGame`). The
+step requests received from every connection are queued and run together, in a
+single simulation tick, once every session is waiting for its step or after
+`batch_delay` seconds. The replies of a tick are then sent back together.
+
+Every message, in both directions, is a (command, flags, session, length)
+header packed as "<BBHI" followed by a payload of that length. Requests carry
+flags (WITH_SEED, WITH_STATE) and replies carry a status (OK, or ERROR with a
+UTF-8 message as payload). A connection answers its requests in order, one at a
+time. The payloads are:
+
+- OPEN: request (dino_count, max_game_speed, seed) packed as "<IIq", the seed
+  being used when WITH_SEED is set. The reply's session is the new session.
+- CLOSE: no payload either way.
+- STEP: request repeat as "<H" followed by one int8 action per dinosaur. The
+  reply holds the score gained by each dinosaur ("<i4"), whether each one is
+  dead (uint8), whether the game is over (uint8) and, with WITH_STATE, the
+  (dino_count, 10) state ("<f4").
+- RESET: request the seed as "<q" with WITH_SEED. The reply holds the state
+  with WITH_STATE.
+- GET_STATE: the reply holds the (dino_count, 10) state ("<f4").
+- GET_SCORES: the reply holds the score of each dinosaur ("<i8").
+"""
+
+import argparse
+import asyncio
+import itertools
+import socket
+import struct
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from chrome_trex.core.multi_dino_game import MultiDinoGame
+
+HEADER = struct.Struct("<BBHI")
+OPEN_REQUEST = struct.Struct("<IIq")
+STEP_REQUEST = struct.Struct("<H")
+SEED = struct.Struct("<q")
+MAX_PAYLOAD = 1 << 26
+MAX_SESSIONS = 1 << 16
+
+# Commands
+OPEN = 1
+CLOSE = 2
+STEP = 3
+RESET = 4
+GET_STATE = 5
+GET_SCORES = 6
+
+# Request flags
+WITH_SEED = 1
+WITH_STATE = 2
+
+# Reply statuses
+OK = 0
+ERROR = 1
+
+Address = Union[str, Tuple[str, int]]
+
+
+def _state_bytes(game: MultiDinoGame) -> bytes:
+    return game.get_state_array().astype("<f4", copy=False).tobytes()
+
+
+class GameServer:
+    """
+    Hosts the sessions of every connected client and steps them in batches.
+    """
+
+    def __init__(self, batch_delay: float = 0):
+        """
+        Create a server, which starts listening with `start`.
+
+        Args:
+            batch_delay (float, optional): Maximum number of seconds a step
+                request waits for the requests of other sessions before a tick
+                runs. Defaults to 0, in which case a tick runs as soon as the
+                requests already received have been read.
+        """
+        self.batch_delay = batch_delay
+        self.session_count = 0
+        # Number of ticks run and of steps taken in them
+        self.ticks = 0
+        self.steps = 0
+        self._pending: List[Tuple] = []
+        self._tick_handle: Optional[asyncio.Handle] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(
+        self, path: Optional[str] = None, host: str = "127.0.0.1", port: int = 0
+    ) -> Address:
+        """
+        Start listening on a Unix socket, or on a TCP port.
+
+        Args:
+            path (str, optional): Path of the Unix socket. Defaults to None, in
+                which case the server listens on host and port.
+            host (str, optional): Host to listen on. Defaults to "127.0.0.1".
+            port (int, optional): TCP port to listen on. Defaults to 0, in which
+                case a free port is picked.
+
+        Returns:
+            str or tuple: The path of the socket, or its (host, port).
+        """
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path)
+            return path
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self) -> None:
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """
+        Stop listening. The sessions are closed with their connections.
+        """
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        sock = writer.get_extra_info("socket")
+        if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        games: Dict[int, MultiDinoGame] = {}
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(HEADER.size)
+                    command, flags, session, length = HEADER.unpack(header)
+                    if length > MAX_PAYLOAD:
+                        break
+                    payload = await reader.readexactly(length)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                try:
+                    session, reply = await self._dispatch(
+                        games, command, flags, session, payload
+                    )
+                    status = OK
+                except Exception as error:
+                    status, reply = ERROR, f"{type(error).__name__}: {error}".encode()
+                writer.write(HEADER.pack(command, status, session, len(reply)) + reply)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for game in games.values():
+                game.close()
+            self.session_count -= len(games)
+            writer.close()
+
+    async def _dispatch(
+        self,
+        games: Dict[int, MultiDinoGame],
+        command: int,
+        flags: int,
+        session: int,
+        payload: bytes,
+    ) -> Tuple[int, bytes]:
+        if command == OPEN:
+            dino_count, max_game_speed, seed = OPEN_REQUEST.unpack(payload)
+            if dino_count < 1:
+                raise ValueError("A game needs at least one dinosaur")
+            session = next(i for i in itertools.count() if i not in games)
+            if session >= MAX_SESSIONS:
+                raise ValueError("Too many sessions on this connection")
+            games[session] = MultiDinoGame(
+                dino_count,
+                fps=0,
+                max_game_speed=max_game_speed,
+                render=False,
+                seed=seed if flags & WITH_SEED else None,
+            )
+            self.session_count += 1
+            return session, b""
+
+        game = games.get(session)
+        if game is None:
+            raise ValueError(f"No session {session} on this connection")
+        if command == STEP:
+            (repeat,) = STEP_REQUEST.unpack_from(payload)
+            actions = np.frombuffer(payload, dtype=np.int8, offset=STEP_REQUEST.size)
+            if len(actions) != game.dino_count:
+                raise ValueError(f"Expected {game.dino_count} actions")
+            return session, await self._step(game, actions, max(repeat, 1), flags)
+        if command == RESET:
+            game.reset(SEED.unpack(payload)[0] if flags & WITH_SEED else None)
+            return session, _state_bytes(game) if flags & WITH_STATE else b""
+        if command == GET_STATE:
+            return session, _state_bytes(game)
+        if command == GET_SCORES:
+            return session, game.dinos.score.astype("<i8").tobytes()
+        if command == CLOSE:
+            games.pop(session).close()
+            self.session_count -= 1
+            return session, b""
+        raise ValueError(f"Unknown command {command}")
+
+    def _step(
+        self, game: MultiDinoGame, actions: np.ndarray, repeat: int, flags: int
+    ) -> asyncio.Future:
+        """
+        Queue a step for the next tick, and get the future of its reply.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((game, actions, repeat, flags, future))
+        if len(self._pending) >= self.session_count:
+            # Every session is waiting for its step, there is nothing to wait for
+            self._tick()
+        elif self._tick_handle is None:
+            if self.batch_delay > 0:
+                self._tick_handle = loop.call_later(self.batch_delay, self._tick)
+            else:
+                self._tick_handle = loop.call_soon(self._tick)
+        return future
+
+    def _tick(self) -> None:
+        """
+        Run every queued step, and resolve their futures.
+        """
+        if self._tick_handle is not None:
+            self._tick_handle.cancel()
+            self._tick_handle = None
+        pending, self._pending = self._pending, []
+        self.ticks += 1
+        self.steps += len(pending)
+        for game, actions, repeat, flags, future in pending:
+            if future.cancelled():
+                continue
+            try:
+                rewards, dead = game.step(actions, repeat)
+                parts = [
+                    rewards.astype("<i4").tobytes(),
+                    dead.tobytes(),
+                    bytes([game.game_over]),
+                ]
+                if flags & WITH_STATE:
+                    parts.append(_state_bytes(game))
+                future.set_result(b"".join(parts))
+            except Exception as error:
+                future.set_exception(error)
+
+
+class GameClient:
+    """
+    A blocking client of a `GameServer`, holding a single connection.
+    """
+
+    def __init__(self, address: Address, timeout: Optional[float] = None):
+        """
+        Connect to a server.
+
+        Args:
+            address (str or tuple): Path of the server's Unix socket, or its
+                (host, port).
+            timeout (float, optional): Timeout of the socket operations, in
+                seconds. Defaults to None, in which case they block.
+        """
+        if isinstance(address, str):
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.settimeout(timeout)
+            self.socket.connect(address)
+        else:
+            self.socket = socket.create_connection(address, timeout)
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def __enter__(self) -> "GameClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _read(self, size: int) -> bytes:
+        data = bytearray(size)
+        view = memoryview(data)
+        while view:
+            received = self.socket.recv_into(view)
+            if not received:
+                raise ConnectionError("The server closed the connection")
+            view = view[received:]
+        return bytes(data)
+
+    def request(
+        self, command: int, session: int = 0, flags: int = 0, payload: bytes = b""
+    ) -> Tuple[int, bytes]:
+        """
+        Send a request and wait for its reply.
+
+        Returns:
+            tuple: The session and the payload of the reply.
+
+        Raises:
+            RuntimeError: If the server couldn't process the request.
+        """
+        self.socket.sendall(
+            HEADER.pack(command, flags, session, len(payload)) + payload
+        )
+        _, status, session, length = HEADER.unpack(self._read(HEADER.size))
+        reply = self._read(length)
+        if status != OK:
+            raise RuntimeError(reply.decode())
+        return session, reply
+
+    def open_game(
+        self, dino_count: int = 1, max_game_speed: int = 12, seed: Optional[int] = None
+    ) -> "RemoteGame":
+        """
+        Open a session on the server.
+
+        Args:
+            dino_count (int, optional): Number of dinosaurs in the game. Defaults
+                to 1.
+            max_game_speed (int, optional): Maximum game speed. Defaults to 12.
+            seed (int, optional): Seed of the game's random generator. Defaults to
+                None, in which case the generator is seeded from the system.
+
+        Returns:
+            RemoteGame: The game of the new session.
+        """
+        payload = OPEN_REQUEST.pack(dino_count, max_game_speed, seed or 0)
+        flags = 0 if seed is None else WITH_SEED
+        session, _ = self.request(OPEN, flags=flags, payload=payload)
+        return RemoteGame(self, session, dino_count)
+
+    def close(self) -> None:
+        """
+        Close the connection, which closes its sessions on the server.
+        """
+        self.socket.close()
+
+
+class RemoteGame:
+    """
+    A game hosted by a `GameServer`, with the interface of a headless
+    `MultiDinoGame`.
+
+    The state sent back with each step and reset is kept, so that `get_state`
+    doesn't need a round trip.
+    """
+
+    def __init__(self, client: GameClient, session: int, dino_count: int):
+        self.client = client
+        self.session = session
+        self.dino_count = dino_count
+        self.game_over = False
+        self._state: Optional[np.ndarray] = None
+
+    def step(
+        self, actions: Sequence[int], repeat: int = 1
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Advance the game by a single frame, or by repeat frames taking the same
+        actions.
+
+        Args:
+            actions (list): A list of actions for each dinosaur
+                (e.g., ACTION_FORWARD, ACTION_UP, ACTION_DOWN = 0, 1, 2).
+            repeat (int, optional): Number of frames to advance. Defaults to 1.
+
+        Returns:
+            tuple: The score gained by each dinosaur during the step and whether
+                each dinosaur is dead, as two (dino_count,) arrays.
+        """
+        payload = STEP_REQUEST.pack(repeat) + np.asarray(actions, np.int8).tobytes()
+        _, reply = self.client.request(STEP, self.session, WITH_STATE, payload)
+        n = self.dino_count
+        rewards = np.frombuffer(reply, "<i4", n).astype(np.int64)
+        dead = np.frombuffer(reply, np.bool_, n, 4 * n).copy()
+        self.game_over = bool(reply[5 * n])
+        self._state = np.frombuffer(reply, "<f4", n * 10, 5 * n + 1).reshape(n, 10)
+        return rewards, dead
+
+    def reset(self, seed: Optional[int] = None) -> None:
+        """
+        Reset the game.
+
+        Args:
+            seed (int, optional): New seed for the game's random generator.
+                Defaults to None, in which case the generator keeps its current
+                state.
+        """
+        flags = WITH_STATE
+        payload = b""
+        if seed is not None:
+            flags |= WITH_SEED
+            payload = SEED.pack(seed)
+        _, reply = self.client.request(RESET, self.session, flags, payload)
+        self.game_over = False
+        self._state = np.frombuffer(reply, "<f4").reshape(self.dino_count, 10)
+
+    def get_state(self) -> np.ndarray:
+        """
+        Get the current state of the game for each dinosaur.
+
+        Returns:
+            np.ndarray: A (dino_count, 10) float32 array, as returned by
+                `MultiDinoGame.get_state_array`.
+        """
+        if self._state is None:
+            _, reply = self.client.request(GET_STATE, self.session)
+            self._state = np.frombuffer(reply, "<f4").reshape(self.dino_count, 10)
+        return self._state.astype(np.float32)
+
+    def get_scores(self) -> np.ndarray:
+        """
+        Get the scores of all player dinosaurs.
+
+        Returns:
+            np.ndarray: A (dino_count,) int64 array.
+        """
+        _, reply = self.client.request(GET_SCORES, self.session)
+        return np.frombuffer(reply, "<i8").astype(np.int64)
+
+    def close(self) -> None:
+        """
+        Close the session on the server.
+        """
+        self.client.request(CLOSE, self.session)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m chrome_trex.server",
+        description=__doc__.split("\n\n")[0],
+    )
+    parser.add_argument(
+        "--unix", metavar="PATH", help="Listen on a Unix socket at PATH."
+    )
+    parser.add_argument(
+        "--host", default="127.0.0.1", help="Host to listen on (default: %(default)s)."
+    )
+    parser.add_argument(
+        "--port", type=int, default=5555, help="TCP port (default: %(default)s)."
+    )
+    parser.add_argument(
+        "--batch-delay",
+        type=float,
+        default=0,
+        help="Seconds a step waits for the other sessions (default: %(default)s).",
+    )
+    args = parser.parse_args(argv)
+
+    async def serve():
+        server = GameServer(args.batch_delay)
+        address = await server.start(args.unix, args.host, args.port)
+        print(f"Listening on {address}", flush=True)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
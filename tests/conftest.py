@@ -0,0 +1,28 @@
+import random
+
+import pytest
+from chrome_trex import ACTION_DOWN, ACTION_FORWARD, ACTION_UP
+
+
+def _choose_actions(state, rng):
+    # Jump or duck when an obstacle gets close, at a distance that differs from
+    # one dinosaur to the next, so that they die at different times
+    actions = []
+    for i, (_, X, Y, *_) in enumerate(state):
+        if 0 < X < 0.08 + 0.02 * (i % 5) + rng.random() * 0.05:
+            actions.append(ACTION_UP if Y > -0.15 or i % 2 else ACTION_DOWN)
+        elif rng.random() < 0.02:
+            actions.append(rng.choice([ACTION_UP, ACTION_DOWN]))
+        else:
+            actions.append(ACTION_FORWARD)
+    return actions
+
+
+@pytest.fixture
+def policy():
+    """
+    A seeded policy mapping the states of a game to actions that keep most
+    dinosaurs alive for a while.
+    """
+    rng = random.Random(0)
+    return lambda game: _choose_actions(game.get_state(), rng)
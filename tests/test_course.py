@@ -0,0 +1,19 @@
+import numpy as np
+from chrome_trex import MultiDinoGame, generate_course
+
+
+def test_course_plays_like_live_game(policy):
+    seed, frames = 6, 5000
+    live = MultiDinoGame(10, fps=0, seed=seed, render=False, max_game_speed=8)
+    course = MultiDinoGame(10, fps=0, seed=seed, render=False, max_game_speed=8)
+    course.use_course(generate_course(seed, frames, max_game_speed=8))
+
+    while not live.game_over and live.counter < frames:
+        actions = policy(live)
+        for live_result, course_result in zip(live.step(actions), course.step(actions)):
+            np.testing.assert_array_equal(live_result, course_result)
+        assert live.get_state() == course.get_state()
+    assert course.game_over == live.game_over
+    np.testing.assert_array_equal(live.get_scores(), course.get_scores())
+    # The episode must go past a few speed increases to be worth comparing
+    assert live.gamespeed > 5
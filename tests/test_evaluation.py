@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from chrome_trex import evaluate_population
+
+
+@pytest.mark.parametrize("trial", range(6))
+def test_several_seeds_match_separate_runs(trial):
+    # Random networks die at different times, so the dinosaurs still alive in
+    # the batched games often add up to the whole population
+    rng = np.random.default_rng(trial)
+    dino_count = 4
+    layers = [
+        (rng.normal(size=(dino_count, 10, 6)), rng.normal(size=(dino_count, 6))),
+        rng.normal(size=(dino_count, 6, 3)) * 3,
+    ]
+    seeds = [trial, trial + 100]
+
+    together = evaluate_population(layers, seeds=seeds, max_frames=2000)
+    separate = [
+        evaluate_population(layers, seeds=[seed], max_frames=2000) for seed in seeds
+    ]
+
+    for i, fitness in enumerate(separate):
+        np.testing.assert_array_equal(together.scores[i], fitness.scores[0])
+        np.testing.assert_array_equal(
+            together.frames_survived[i], fitness.frames_survived[0]
+        )
+        np.testing.assert_array_equal(
+            together.obstacles_passed[i], fitness.obstacles_passed[0]
+        )
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from chrome_trex import ACTION_FORWARD, ACTION_UP, MultiDinoGame, generate_course
+
+
+def make_games(seed, with_course):
+    games = [
+        MultiDinoGame(3, fps=0, seed=seed, render=False, max_game_speed=8)
+        for _ in range(2)
+    ]
+    if with_course:
+        course = generate_course(seed, 5000, 8)
+        for game in games:
+            game.use_course(course)
+    return games
+
+
+def same_snapshots(first, second):
+    first, second = first.get_snapshot(), second.get_snapshot()
+    first_dinos, second_dinos = first.pop("dinos"), second.pop("dinos")
+    return first == second and all(
+        np.array_equal(first_dinos[key], second_dinos[key]) for key in first_dinos
+    )
+
+
+@pytest.mark.parametrize("with_course", [False, True])
+@pytest.mark.parametrize("window", [0, 150])
+def test_fast_forward_matches_stepping(with_course, window):
+    fast, stepped = make_games(7, with_course)
+    spans = 0
+    while not fast.game_over and fast.counter < 3000:
+        frames = fast.fast_forward(window=window)
+        if frames:
+            spans += 1
+            for _ in range(frames):
+                stepped.step([ACTION_FORWARD] * 3)
+            assert same_snapshots(fast, stepped)
+        # Jump over whatever is close, to keep some dinosaurs playing
+        state = fast.get_state_array()
+        actions = [
+            ACTION_UP if 0 < state[i, 1] < 0.1 + 0.03 * i else ACTION_FORWARD
+            for i in range(3)
+        ]
+        fast.step(actions)
+        stepped.step(actions)
+    assert spans > 0
+    assert same_snapshots(fast, stepped)
+
+
+def test_fast_forward_rejects_negative_windows():
+    game = MultiDinoGame(1, fps=0, seed=0, render=False)
+    with pytest.raises(ValueError):
+        game.fast_forward(window=-1)
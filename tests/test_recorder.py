@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from chrome_trex import EpisodeReplayer, MultiDinoGame, generate_course
+
+
+@pytest.mark.parametrize("with_course", [False, True])
+@pytest.mark.parametrize("compress", [False, True])
+def test_replay_verifies_recording(tmp_path, policy, with_course, compress):
+    path = str(tmp_path / "episodes.trex")
+    game = MultiDinoGame(10, fps=0, seed=6, render=False, max_game_speed=8)
+    course = generate_course(6, 5000, max_game_speed=8) if with_course else None
+    game.use_course(course)
+    recorder = game.start_recording(
+        path, states=True, compress=compress, chunk_frames=100
+    )
+
+    played = []
+    for episode in range(3):
+        if episode:
+            game.reset()
+        while not game.game_over and game.counter < 1500:
+            # Take some actions for several frames in a single step
+            repeat = 3 if game.counter % 50 < 10 else 1
+            game.step(policy(game), repeat=repeat)
+        played.append(game.get_scores())
+    game.stop_recording()
+
+    episodes = list(EpisodeReplayer(path))
+    assert [episode.index for episode in episodes] == [0, 1, 2]
+    assert all(len(episode.frames) > 100 for episode in episodes)
+    assert sum(len(episode.frames) for episode in episodes) == recorder.frames_recorded
+
+    # Every replayed frame is checked against the recorded scores and states
+    replayed = {}
+    for record, replay in EpisodeReplayer(path).replay(verify=True, course=course):
+        replayed[record["episode"]] = replay.get_scores()
+    np.testing.assert_array_equal(list(replayed.values()), played)
+
+    if with_course:
+        with pytest.raises(RuntimeError, match="diverged"):
+            for _ in EpisodeReplayer(path).replay(verify=True):
+                pass
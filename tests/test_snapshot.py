@@ -0,0 +1,49 @@
+import json
+
+import pytest
+from chrome_trex import MultiDinoGame, generate_course
+from chrome_trex.core.recorder import decode_snapshot, encode_snapshot
+
+
+def play(game, actions):
+    """
+    Take the given actions, returning the states and scores after each frame.
+    """
+    frames = []
+    for frame_actions in actions:
+        game.step(frame_actions)
+        frames.append((game.get_state(), game.get_scores(), game.game_over))
+    return frames
+
+
+@pytest.mark.parametrize("course", [False, True])
+def test_restored_games_replay_identically(policy, course):
+    game = MultiDinoGame(10, fps=0, seed=6, render=False, max_game_speed=8)
+    if course:
+        game.use_course(generate_course(6, 5000, max_game_speed=8))
+    for _ in range(500):
+        game.step(policy(game))
+    assert not game.game_over
+
+    snapshot = game.get_snapshot()
+    clone = game.clone()
+    # The snapshot as it goes through a recording
+    data = json.loads(json.dumps(encode_snapshot(snapshot)))
+    decoded = decode_snapshot(data)
+
+    actions = []
+    frames = []
+    while not game.game_over and len(actions) < 1500:
+        actions.append(policy(game))
+        frames += play(game, actions[-1:])
+    assert len(actions) > 100
+
+    game.restore_snapshot(snapshot)
+    assert play(game, actions) == frames
+    assert play(clone, actions) == frames
+
+    other = MultiDinoGame(10, fps=0, seed=1, render=False, max_game_speed=8)
+    if course:
+        other.use_course(game.course)
+    other.restore_snapshot(decoded)
+    assert play(other, actions) == frames
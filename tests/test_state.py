@@ -0,0 +1,29 @@
+import random
+
+import numpy as np
+import pytest
+from chrome_trex import ACTION_DOWN, ACTION_FORWARD, ACTION_UP, DinoGame, MultiDinoGame
+
+
+@pytest.mark.parametrize("dino_count", [1, 2, 10, 40])
+@pytest.mark.parametrize("alive_only", [False, True])
+def test_state_array_matches_state(dino_count, alive_only):
+    game = MultiDinoGame(dino_count, fps=0, seed=dino_count, render=False)
+    rng = random.Random(dino_count)
+    actions = [ACTION_FORWARD] * 6 + [ACTION_UP, ACTION_DOWN]
+    for _ in range(1500):
+        if game.game_over:
+            game.reset()
+        game.step([rng.choice(actions) for _ in range(dino_count)])
+        state = game.get_state_array(alive_only=alive_only)
+        expected = np.array(game.get_state(alive_only=alive_only), dtype=np.float32)
+        np.testing.assert_array_equal(state, expected.reshape(state.shape))
+
+
+def test_single_state_array_checks_out():
+    game = DinoGame(fps=0, seed=0, render=False)
+    out = np.empty(10, dtype=np.float32)
+    assert game.get_state_array(out) is out
+    assert out.tolist() == np.float32(game.get_state()).tolist()
+    with pytest.raises(ValueError, match=r"shape \(10,\)"):
+        game.get_state_array(np.empty(10, dtype=np.float64))